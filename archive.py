@@ -0,0 +1,192 @@
+import os
+import json
+import time
+import shutil
+import threading
+import subprocess
+from urllib.parse import urlparse
+import config
+
+# Debug screenshots GoogleMeetBot leaves in its output directory
+SCREENSHOTS = ["meeting_page.png", "participants_panel.png", "force_join.png", "join_error.png"]
+
+# Speech-quality Opus is plenty for re-listening and re-transcribing
+ARCHIVE_BITRATE = "16k"
+
+BUNDLE_MANIFEST = "transcript.json"
+
+# Post-processing threads apply retention as each meeting finishes
+_retention_lock = threading.Lock()
+
+
+def _meeting_code(meet_url):
+    code = urlparse(meet_url or "").path.strip("/").replace("/", "-")
+    return code or "meeting"
+
+
+def encode_compact_audio(input_file, output_file):
+    """Re-encode a recording as 16 kHz mono Opus."""
+    subprocess.run([
+        "ffmpeg", "-y",
+        "-i", input_file,
+        "-ac", "1",
+        "-ar", "16000",
+        "-c:a", "libopus",
+        "-b:a", ARCHIVE_BITRATE,
+        "-application", "voip",
+        output_file
+    ], check=True, capture_output=True)
+    return output_file
+
+
+def archive_meeting(audio_file, segments, meet_url, started_at, summary=None, participants=None,
+                    output_dir=None, archive_dir=None, keep_screenshots=None, noise_profile=None):
+    """Pack one meeting's artifacts into a compact bundle and remove the originals.
+
+    The bundle holds audio.opus, transcript.json (segments with offsets,
+    summary, participants, the noise profile used and any speech-activity
+    timestamps or capture gaps) and, if asked for, a debug/ folder with the
+    screenshots. Returns the bundle path.
+    """
+    archive_dir = archive_dir or getattr(config, 'ARCHIVE_DIR', 'archive')
+    if keep_screenshots is None:
+        keep_screenshots = getattr(config, 'ARCHIVE_KEEP_SCREENSHOTS', False)
+    output_dir = output_dir or os.getcwd()
+
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(started_at))
+    bundle = os.path.join(archive_dir, f"{stamp}_{_meeting_code(meet_url)}")
+    os.makedirs(bundle, exist_ok=True)
+
+    manifest = {
+        "meet_url": meet_url,
+        "started_at": started_at,
+        "participants": participants or [],
+        "summary": summary,
+        "segments": segments,
+        "noise_profile": noise_profile,
+        "audio": None,
+    }
+
+    leftovers = []
+    if audio_file and os.path.exists(audio_file):
+        stem = os.path.splitext(audio_file)[0]
+        speech_file = stem + ".speech.json"
+        if os.path.exists(speech_file):
+            with open(speech_file) as f:
+                manifest["speech_activity"] = json.load(f)
+            leftovers.append(speech_file)
+        gaps_file = stem + ".gaps.json"
+        if os.path.exists(gaps_file):
+            with open(gaps_file) as f:
+                manifest["capture_gaps"] = json.load(f)
+            leftovers.append(gaps_file)
+
+        try:
+            encode_compact_audio(audio_file, os.path.join(bundle, "audio.opus"))
+            manifest["audio"] = "audio.opus"
+            # The source recording and its intermediate WAV are now redundant
+            leftovers += [audio_file, stem + ".wav"]
+        except (subprocess.CalledProcessError, OSError) as e:
+            print(f"Could not encode archive audio, keeping original: {e}")
+            shutil.copy2(audio_file, bundle)
+            manifest["audio"] = os.path.basename(audio_file)
+
+    for name in SCREENSHOTS:
+        path = os.path.join(output_dir, name)
+        if not os.path.exists(path):
+            continue
+        if keep_screenshots:
+            os.makedirs(os.path.join(bundle, "debug"), exist_ok=True)
+            shutil.move(path, os.path.join(bundle, "debug", name))
+        else:
+            leftovers.append(path)
+
+    with open(os.path.join(bundle, BUNDLE_MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    for path in leftovers:
+        if os.path.exists(path):
+            os.remove(path)
+
+    print(f"Archived meeting to {bundle} ({bundle_size(bundle) / 1024:.1f}KB)")
+    return bundle
+
+
+def bundle_size(bundle):
+    total = 0
+    for root, _, files in os.walk(bundle):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except FileNotFoundError:
+                pass  # Removed while we looked
+    return total
+
+
+def list_bundles(archive_dir):
+    """All bundles in the archive as (path, mtime, size), oldest first."""
+    if not os.path.isdir(archive_dir):
+        return []
+    bundles = []
+    for name in os.listdir(archive_dir):
+        path = os.path.join(archive_dir, name)
+        manifest = os.path.join(path, BUNDLE_MANIFEST)
+        try:
+            bundles.append((path, os.path.getmtime(manifest), bundle_size(path)))
+        except FileNotFoundError:
+            continue  # Not a bundle, or removed while we looked
+    return sorted(bundles, key=lambda bundle: bundle[1])
+
+
+def enforce_retention(archive_dir=None, max_age_days=None, max_total_mb=None):
+    """Delete bundles older than max_age_days, then the oldest until under max_total_mb.
+
+    Only the bundle on disk goes - its transcript stays searchable in the
+    transcript store. Returns the list of removed bundle paths.
+    """
+    archive_dir = archive_dir or getattr(config, 'ARCHIVE_DIR', 'archive')
+    if max_age_days is None:
+        max_age_days = getattr(config, 'ARCHIVE_MAX_AGE_DAYS', None)
+    if max_total_mb is None:
+        max_total_mb = getattr(config, 'ARCHIVE_MAX_TOTAL_MB', None)
+
+    with _retention_lock:
+        removed = _apply_retention(archive_dir, max_age_days, max_total_mb)
+    if removed:
+        print(f"Retention policy removed {len(removed)} bundle(s) from {archive_dir}")
+    return removed
+
+
+def _apply_retention(archive_dir, max_age_days, max_total_mb):
+    bundles = list_bundles(archive_dir)
+    removed = []
+
+    if max_age_days:
+        cutoff = time.time() - max_age_days * 86400
+        for bundle in [b for b in bundles if b[1] < cutoff]:
+            shutil.rmtree(bundle[0], ignore_errors=True)
+            removed.append(bundle[0])
+            bundles.remove(bundle)
+
+    if max_total_mb:
+        limit = max_total_mb * 1024 * 1024
+        total = sum(size for _, _, size in bundles)
+        while bundles and total > limit:
+            path, _, size = bundles.pop(0)
+            shutil.rmtree(path, ignore_errors=True)
+            removed.append(path)
+            total -= size
+    return removed
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Apply the archive retention policy')
+    parser.add_argument('--archive-dir', type=str, default=None, help='Archive directory (default: config.ARCHIVE_DIR)')
+    parser.add_argument('--max-age-days', type=float, default=None, help='Remove bundles older than this')
+    parser.add_argument('--max-total-mb', type=float, default=None, help='Keep the archive under this size')
+
+    args = parser.parse_args()
+
+    enforce_retention(args.archive_dir, args.max_age_days, args.max_total_mb)
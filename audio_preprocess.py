@@ -0,0 +1,279 @@
+import struct
+import subprocess
+import numpy as np
+import speech_recognition as sr
+from instrumentation import span
+
+# What the recognizer is fed: 16 kHz mono, 16-bit
+TARGET_RATE = 16000
+
+# ffmpeg only decodes. Opus always decodes at 48 kHz, so asking for it costs
+# nothing for our recordings and leaves an integer ratio down to 16 kHz.
+DECODE_RATE = 48000
+
+# Same speech band the ffmpeg path used (highpass=f=200,lowpass=f=3000)
+BAND = (200, 3000)
+FILTER_TAPS = 1023
+
+# Input frames read from ffmpeg per block
+BLOCK_FRAMES = 1 << 16
+
+# Loudness is measured on 20 ms frames
+FRAME_MS = 20
+TARGET_DBFS = -20.0
+MAX_GAIN_DB = 30.0
+
+
+def design_bandpass(low, high, rate, taps=FILTER_TAPS):
+    """Linear-phase windowed-sinc FIR passing low..high Hz."""
+    n = np.arange(taps) - (taps - 1) / 2
+    lowpass = lambda cutoff: 2 * cutoff / rate * np.sinc(2 * cutoff / rate * n)
+    return ((lowpass(high) - lowpass(low)) * np.hamming(taps)).astype(np.float32)
+
+
+class BlockFilter:
+    """Overlap-add FFT convolution of a stream with a FIR, decimated by an integer factor.
+
+    The band-pass already removes everything above the new Nyquist
+    frequency, so decimating is just keeping every factor-th sample.
+    """
+
+    def __init__(self, taps, block, factor=1):
+        self.nfft = 1 << int(np.ceil(np.log2(block + len(taps) - 1)))
+        self.spectrum = np.fft.rfft(taps, self.nfft)
+        self.tail = np.zeros(len(taps) - 1)
+        # Drop the filter's group delay so output offsets match the input's
+        self.delay = (len(taps) - 1) // 2
+        self.skip = self.delay
+        self.factor = factor
+        self.phase = 0
+
+    def _emit(self, y):
+        if self.skip:
+            drop = min(self.skip, len(y))
+            y = y[drop:]
+            self.skip -= drop
+        out = y[self.phase::self.factor]
+        self.phase = (self.phase - len(y)) % self.factor
+        return out
+
+    def process(self, x):
+        y = np.fft.irfft(np.fft.rfft(x, self.nfft) * self.spectrum, self.nfft)
+        overlap = len(self.tail)
+        y[:overlap] += self.tail
+        self.tail = y[len(x):len(x) + overlap].copy()
+        return self._emit(y[:len(x)])
+
+    def flush(self):
+        """Output still held back by the group delay."""
+        tail, self.tail = self.tail, np.zeros_like(self.tail)
+        return self._emit(tail[:self.delay])
+
+
+def _read_wav_header(stream):
+    # ffmpeg streams a WAV header with unknown sizes; only fmt matters
+    riff = stream.read(12)
+    if len(riff) < 12 or riff[:4] != b'RIFF' or riff[8:12] != b'WAVE':
+        raise ValueError("ffmpeg did not produce a WAV stream")
+    channels = rate = None
+    while True:
+        header = stream.read(8)
+        if len(header) < 8:
+            raise ValueError("no audio data in stream")
+        chunk_id, size = struct.unpack('<4sI', header)
+        if chunk_id == b'data':
+            return channels, rate
+        body = stream.read(size + (size & 1))
+        if chunk_id == b'fmt ':
+            channels, rate = struct.unpack('<HI', body[2:8])
+
+
+def _fill(stream, view):
+    got = 0
+    while got < len(view):
+        n = stream.readinto(view[got:])
+        if not n:
+            break
+        got += n
+    return got
+
+
+def decode_and_filter(input_file, rate=TARGET_RATE, band=BAND):
+    """Decode with ffmpeg and band-pass, downmix and resample in process.
+
+    Yields float32 blocks of samples in [-1, 1] at ``rate``, so the caller
+    decides how much of the recording is held at once. PCM is read from
+    the pipe into one reused buffer; each yielded block is a new array.
+    """
+    proc = subprocess.Popen([
+        "ffmpeg", "-v", "error",
+        "-i", input_file,
+        "-ar", str(DECODE_RATE),
+        "-c:a", "pcm_f32le",
+        "-f", "wav", "-"
+    ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    try:
+        channels, source_rate = _read_wav_header(proc.stdout)
+        if source_rate % rate:
+            raise ValueError(f"can't resample {source_rate} Hz to {rate} Hz by decimation")
+        fir = BlockFilter(design_bandpass(*band, source_rate), BLOCK_FRAMES, source_rate // rate)
+
+        buf = bytearray(BLOCK_FRAMES * channels * 4)
+        view = memoryview(buf)
+        while True:
+            got = _fill(proc.stdout, view)
+            frames = got // (4 * channels)
+            if not frames:
+                break
+            samples = np.frombuffer(buf, dtype='<f4', count=frames * channels)
+            if channels > 1:
+                samples = samples.reshape(-1, channels).mean(axis=1)
+            yield fir.process(samples).astype(np.float32)
+            if got < len(buf):
+                break
+        yield fir.flush().astype(np.float32)
+    finally:
+        proc.stdout.close()
+        stderr = proc.stderr.read()
+        proc.wait()
+
+    if proc.returncode:
+        raise RuntimeError(f"ffmpeg could not decode {input_file}: {stderr.decode('utf-8', 'replace').strip()}")
+
+
+def _segments(blocks, segment_samples):
+    """Regroup blocks into segment_samples-long arrays (the last may be shorter)."""
+    segment = np.empty(segment_samples, dtype=np.float32)
+    filled = 0
+    for block in blocks:
+        while len(block):
+            take = min(len(block), segment_samples - filled)
+            segment[filled:filled + take] = block[:take]
+            filled += take
+            block = block[take:]
+            if filled == segment_samples:
+                yield segment
+                filled = 0
+    if filled:
+        yield segment[:filled]
+
+
+def frame_levels(samples, rate=TARGET_RATE, frame_ms=FRAME_MS):
+    """RMS of each frame_ms frame."""
+    frame = rate * frame_ms // 1000
+    usable = len(samples) // frame * frame
+    if not usable:
+        return np.zeros(0, dtype=np.float32)
+    return np.sqrt(np.mean(np.square(samples[:usable].reshape(-1, frame)), axis=1))
+
+
+def _quiet_limit(noise_floor):
+    # Frames about 12 dB over the floor count as speech
+    return max(noise_floor * 4, 1e-4)
+
+
+def estimate_levels(levels, noise_floor=None):
+    """(noise floor, speech level) RMS from per-frame levels.
+
+    Without a known noise_floor it is taken as the 10th percentile frame.
+    """
+    if not len(levels):
+        return noise_floor or 0.0, 0.0
+    if noise_floor is None:
+        noise_floor = float(np.percentile(levels, 10))
+    active = levels[levels > _quiet_limit(noise_floor)]
+    if not len(active):
+        # Nobody spoke - don't turn the noise up to speech level
+        return noise_floor, 0.0
+    return noise_floor, float(np.sqrt(np.mean(np.square(active))))
+
+
+def silent_frames(levels, noise_floor=None, speech_ranges=None, frame_ms=FRAME_MS, start_ms=0):
+    """Levels of the frames that are silence.
+
+    speech_ranges are (start_ms, end_ms) stretches the silence gate marked
+    as speech; everything else is silence. start_ms is where levels[0]
+    sits in the file. Without them, quiet frames (by the same 12 dB rule
+    as estimate_levels) count as silence.
+    """
+    if speech_ranges is not None:
+        starts = start_ms + np.arange(len(levels)) * frame_ms
+        in_speech = np.zeros(len(levels), dtype=bool)
+        for start_ms, end_ms in speech_ranges:
+            in_speech |= (starts + frame_ms > start_ms) & (starts < end_ms)
+        return levels[~in_speech]
+    if not len(levels):
+        return levels
+    if noise_floor is None:
+        noise_floor = float(np.percentile(levels, 10))
+    return levels[levels <= _quiet_limit(noise_floor)]
+
+
+def learn_noise_floor(noise_profile, levels, speech_ranges=None, start_ms=0):
+    """Fold the silent frames among levels into noise_profile.
+
+    Returns the noise floor to use for these frames (RMS in [0, 1]), or
+    None while the profile is still uncalibrated.
+    """
+    noise_floor = noise_profile.noise_rms / 32767 if noise_profile.calibrated else None
+    silence = silent_frames(levels, noise_floor, speech_ranges, start_ms=start_ms)
+    if len(silence):
+        noise_profile.update(float(np.mean(silence)) * 32767, len(silence) * FRAME_MS / 1000)
+        noise_floor = noise_profile.noise_rms / 32767
+    return noise_floor
+
+
+def pcm_levels(frame_data, rate=TARGET_RATE):
+    """frame_levels of 16-bit mono PCM bytes, e.g. an sr.AudioData's frame_data."""
+    return frame_levels(np.frombuffer(frame_data, dtype='<i2') / np.float32(32768), rate)
+
+
+def normalize_loudness(samples, speech_rms, target_dbfs=TARGET_DBFS, max_gain_db=MAX_GAIN_DB):
+    """Scale samples in place so speech sits at target_dbfs. Returns the gain in dB."""
+    if speech_rms <= 0:
+        return 0.0
+    gain_db = min(target_dbfs - 20 * np.log10(speech_rms), max_gain_db)
+    samples *= np.float32(10 ** (gain_db / 20))
+    np.clip(samples, -1.0, 1.0, out=samples)
+    return float(gain_db)
+
+
+def preprocess_pieces(input_file, segment_seconds, rate=TARGET_RATE, noise_profile=None, speech_ranges=None):
+    """Decode and clean up a recording for the recognizer, one piece at a time.
+
+    Yields (start_ms, end_ms, sr.AudioData, stats) for consecutive
+    segment_seconds pieces, so only one piece is in memory however long
+    the meeting was. stats has the piece's duration, the applied gain and
+    the noise floor / speech level after normalization, in 16-bit RMS
+    units.
+
+    Each piece is normalized on its own. A calibrated noise_profile
+    supplies the noise floor, and is updated from every piece's silent
+    frames (see silent_frames).
+    """
+    start_ms = 0
+    for samples in _segments(decode_and_filter(input_file, rate), rate * segment_seconds):
+        end_ms = start_ms + len(samples) * 1000 // rate
+        with span("preprocess_audio") as preprocess_span:
+            levels = frame_levels(samples, rate)
+
+            noise_floor = None
+            if noise_profile is not None:
+                noise_floor = learn_noise_floor(noise_profile, levels, speech_ranges, start_ms)
+
+            noise_floor, speech_rms = estimate_levels(levels, noise_floor)
+            gain_db = normalize_loudness(samples, speech_rms)
+            scale = 32767 * 10 ** (gain_db / 20)
+
+            samples *= 32767
+            pcm = samples.astype('<i2')
+            stats = {
+                "seconds": len(pcm) / rate,
+                "gain_db": round(gain_db, 2),
+                "noise_floor_rms": round(noise_floor * scale, 1),
+                "speech_rms": round(speech_rms * scale, 1),
+            }
+            preprocess_span.set(**stats)
+        yield start_ms, end_ms, sr.AudioData(pcm.tobytes(), rate, 2), stats
+        start_ms = end_ms
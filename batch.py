@@ -0,0 +1,133 @@
+import os
+import glob
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from instrumentation import flush as flush_metrics
+
+# Recordings left behind by record_and_transcribe
+RECORDING_PATTERNS = ["meet_audio_*.webm", "fallback_audio_*.wav"]
+
+TRANSCRIPT_SUFFIX = ".transcript.txt"
+SUMMARY_SUFFIX = ".summary.txt"
+
+
+def available_cores():
+    """CPU cores this process may actually use."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def output_paths(recording):
+    stem = os.path.splitext(recording)[0]
+    return stem + TRANSCRIPT_SUFFIX, stem + SUMMARY_SUFFIX
+
+
+def is_done(recording, summarize, retry_empty=False):
+    """True if every output for this recording already exists."""
+    transcript_file, summary_file = output_paths(recording)
+    if not os.path.exists(transcript_file):
+        return False
+    if retry_empty and os.path.getsize(transcript_file) == 0:
+        return False
+    return not summarize or os.path.exists(summary_file)
+
+
+def discover_recordings(directory, recursive=False):
+    """Find archived recordings, oldest first."""
+    found = set()
+    for pattern in RECORDING_PATTERNS:
+        if recursive:
+            found.update(glob.glob(os.path.join(directory, "**", pattern), recursive=True))
+        else:
+            found.update(glob.glob(os.path.join(directory, pattern)))
+    return sorted(found)
+
+
+def _write_atomic(path, text):
+    # Write then rename, so an interrupted run never leaves a half-written
+    # output that would be mistaken for a finished one
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def process_recording(recording, summarize=False):
+    """Decode, transcribe and optionally summarize one recording (runs in a worker)."""
+    from transcriber import transcribe_segments, segments_to_text
+
+    transcript_file, summary_file = output_paths(recording)
+    started = time.time()
+
+    try:
+        if os.path.exists(transcript_file) and os.path.getsize(transcript_file) > 0:
+            with open(transcript_file) as f:
+                transcript = f.read()
+        else:
+            # transcribe_segments converts WebM to a WAV next to the input; drop it
+            # afterwards unless it was already there
+            wav_file = os.path.splitext(recording)[0] + ".wav"
+            had_wav = os.path.exists(wav_file) or recording.endswith(".wav")
+            try:
+                # Raises if decoding or any recognition request fails, so nothing
+                # is written and the next run tries this recording again
+                transcript = segments_to_text(transcribe_segments(recording, strict=True))
+            finally:
+                if not had_wav and os.path.exists(wav_file):
+                    os.remove(wav_file)
+            _write_atomic(transcript_file, transcript)
+
+        if summarize and not os.path.exists(summary_file):
+            from summarizer import generate_summary
+            # Raises on API and network errors, so a failed summary is retried
+            _write_atomic(summary_file, generate_summary(transcript, strict=True))
+    finally:
+        # Pool workers leave through os._exit, so the atexit flush never runs
+        flush_metrics()
+
+    return {"recording": recording, "chars": len(transcript), "elapsed": time.time() - started}
+
+
+def run_batch(directory, summarize=False, workers=None, recursive=False, retry_empty=False):
+    """Process every recording in a directory that hasn't been processed yet."""
+    recordings = discover_recordings(directory, recursive)
+    pending = [r for r in recordings if not is_done(r, summarize, retry_empty)]
+    print(f"Found {len(recordings)} recording(s), {len(recordings) - len(pending)} already done, "
+          f"{len(pending)} to process")
+    if not pending:
+        return []
+
+    workers = min(workers or available_cores(), len(pending))
+    print(f"Processing with {workers} worker process(es)...")
+
+    started = time.time()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(process_recording, r, summarize): r for r in pending}
+        for future in as_completed(futures):
+            recording = futures[future]
+            try:
+                result = future.result()
+                results.append(result)
+                print(f"[{len(results)}/{len(pending)}] {os.path.basename(recording)}: "
+                      f"{result['chars']} characters in {result['elapsed']:.1f}s")
+            except Exception as e:
+                print(f"Failed to process {recording}: {e}")
+
+    print(f"Processed {len(results)}/{len(pending)} recording(s) in {time.time() - started:.0f}s")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Reprocess archived meeting recordings')
+    parser.add_argument('directory', type=str, help='Directory containing meet_audio_*.webm / fallback_audio_*.wav')
+    parser.add_argument('--summarize', action='store_true', help='Also generate a summary for each transcript')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: available cores)')
+    parser.add_argument('--recursive', action='store_true', help='Search subdirectories too')
+    parser.add_argument('--retry-empty', action='store_true', help='Redo recordings whose transcript came out empty')
+
+    args = parser.parse_args()
+
+    run_batch(args.directory, args.summarize, args.workers, args.recursive, args.retry_empty)
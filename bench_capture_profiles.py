@@ -0,0 +1,93 @@
+import os
+import re
+import argparse
+import tempfile
+import subprocess
+from transcriber import CAPTURE_PROFILES, transcribe_audio
+
+
+def encode_with_profile(sample_file, output_file, profile):
+    """Re-encode a sample the way the browser would for a capture profile."""
+    subprocess.run([
+        "ffmpeg", "-y",
+        "-i", sample_file,
+        "-ac", str(profile["channels"]),
+        "-ar", str(profile["sampleRate"]),
+        "-c:a", "libopus",
+        "-b:a", str(profile["bitrate"]),
+        output_file
+    ], check=True, capture_output=True)
+    return output_file
+
+
+def media_duration(audio_file):
+    """Return the length of any file FFmpeg reads in seconds."""
+    result = subprocess.run([
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        audio_file
+    ], check=True, capture_output=True, text=True)
+    return float(result.stdout.strip())
+
+
+def word_accuracy(reference, hypothesis):
+    """Return 1 - word error rate of hypothesis against reference."""
+    ref = re.findall(r"[a-z0-9']+", reference.lower())
+    hyp = re.findall(r"[a-z0-9']+", hypothesis.lower())
+    if not ref:
+        return 0.0
+
+    # Word-level edit distance, one row at a time
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1,
+                               current[j - 1] + 1,
+                               previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+
+    return max(0.0, 1.0 - previous[-1] / len(ref))
+
+
+def run_benchmark(sample_file, reference_text, profiles=None):
+    """Encode the sample with each profile and report size and accuracy."""
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in profiles or CAPTURE_PROFILES:
+            profile = CAPTURE_PROFILES[name]
+            encoded = encode_with_profile(sample_file, os.path.join(workdir, f"{name}.webm"), profile)
+            size = os.path.getsize(encoded)
+
+            transcript = transcribe_audio(encoded)
+            # Transcription no longer leaves a WAV behind to measure
+            minutes = media_duration(encoded) / 60
+
+            results.append({
+                "profile": name,
+                "bytes_per_minute": size / minutes if minutes else 0,
+                "accuracy": word_accuracy(reference_text, transcript),
+            })
+
+    print("\n" + "=" * 60)
+    print(f"{'Profile':<12}{'KB/min':>12}{'vs standard':>14}{'Accuracy':>12}")
+    print("=" * 60)
+    baseline = next((r["bytes_per_minute"] for r in results if r["profile"] == "standard"), None)
+    for r in results:
+        ratio = f"{baseline / r['bytes_per_minute']:.1f}x" if baseline and r["bytes_per_minute"] else "-"
+        print(f"{r['profile']:<12}{r['bytes_per_minute'] / 1024:>12.1f}{ratio:>14}{r['accuracy']:>11.1%}")
+    print("=" * 60)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare capture profiles on a fixed speech sample')
+    parser.add_argument('sample', type=str, help='Reference speech recording (any format FFmpeg reads)')
+    parser.add_argument('reference', type=str, help='Text file with the exact words spoken in the sample')
+    parser.add_argument('--profiles', nargs='+', choices=list(CAPTURE_PROFILES), help='Profiles to compare (default: all)')
+
+    args = parser.parse_args()
+
+    with open(args.reference) as f:
+        run_benchmark(args.sample, f.read(), args.profiles)
@@ -0,0 +1,75 @@
+import os
+import re
+import sys
+import time
+import argparse
+import subprocess
+from cli import STAGE_MODULES
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Browser automation stack that only 'join' and 'schedule' may pull in
+BROWSER_MODULES = {"selenium", "undetected_chromedriver", "webdriver_manager"}
+BROWSER_STAGES = {"join", "schedule"}
+
+# Start-up budget in seconds for the stages that work on existing files
+DEFAULT_BUDGET = 0.8
+
+
+def measure_stage(stage):
+    """Start a fresh interpreter, import one stage and return (seconds, modules)."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import cli; cli.import_stage({stage!r})"],
+        cwd=HERE, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+        raise RuntimeError(f"{stage}: import failed ({error})")
+
+    # "import time: self [us] | cumulative | imported package" lines
+    modules = set()
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+\d+ \|\s+(\S+)", line)
+        if match:
+            modules.add(match.group(1).split(".")[0])
+    return elapsed, modules
+
+
+def check_stages(budget=DEFAULT_BUDGET, stages=None):
+    """Measure each stage and report regressions. Returns True if all pass."""
+    ok = True
+    print(f"{'Stage':<12}{'Start-up':>10}{'Modules':>10}  Status")
+    print("=" * 60)
+    for stage in stages or STAGE_MODULES:
+        try:
+            elapsed, modules = measure_stage(stage)
+        except RuntimeError as e:
+            print(f"{stage:<12}{'-':>10}{'-':>10}  ERROR {e}")
+            ok = False
+            continue
+
+        problems = []
+        if stage not in BROWSER_STAGES:
+            leaked = sorted(BROWSER_MODULES & modules)
+            if leaked:
+                problems.append(f"imports {', '.join(leaked)}")
+            if elapsed > budget:
+                problems.append(f"over {budget:.2f}s budget")
+
+        ok = ok and not problems
+        status = "FAIL " + "; ".join(problems) if problems else "ok"
+        print(f"{stage:<12}{elapsed:>9.3f}s{len(modules):>10}  {status}")
+    print("=" * 60)
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Guard CLI start-up time against import regressions')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help='Seconds allowed for non-browser stages')
+    parser.add_argument('--stages', nargs='+', choices=list(STAGE_MODULES), help='Stages to check (default: all)')
+
+    args = parser.parse_args()
+
+    sys.exit(0 if check_stages(args.budget, args.stages) else 1)
@@ -0,0 +1,247 @@
+import os
+import sys
+import json
+import time
+import types
+import base64
+import argparse
+import resource
+import tempfile
+import threading
+import subprocess
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ProcessPoolExecutor
+
+# The pipeline reads its settings from config.py; the benchmark points every
+# external service at a local stand-in, so a missing config is fine here.
+try:
+    import config
+except ImportError:
+    config = types.ModuleType("config")
+    sys.modules["config"] = config
+
+DEFAULT_DURATIONS = [1, 10, 30, 60, 180]  # Meeting lengths in minutes
+
+
+def make_synthetic_audio(path, minutes, silence_ratio=0.3, bitrate=32000):
+    """Write an Opus/WebM file of tone bursts separated by silence."""
+    # Every 10 seconds: (1 - silence_ratio) of tone, then silence
+    voiced = 10 * (1 - silence_ratio)
+    expr = f"if(lt(mod(t\\,10)\\,{voiced})\\,0.3*sin(2*PI*220*t)*sin(2*PI*3*t)\\,0)"
+    subprocess.run([
+        "ffmpeg", "-y",
+        "-f", "lavfi", "-i", f"aevalsrc={expr}:s=48000:d={minutes * 60}",
+        "-ac", "1", "-c:a", "libopus", "-b:a", str(bitrate),
+        path
+    ], check=True, capture_output=True)
+    return path
+
+
+class FakeDriver:
+    """WebDriver stand-in that answers record_audio's scripts from a local file."""
+
+    def __init__(self, audio_file):
+        self.audio_file = audio_file
+        self.chunks = 0
+
+    def execute_script(self, script, *args):
+        if "meetRecorder.onstop" in script:
+            # Stop-and-collect: hand back the whole recording as base64
+            with open(self.audio_file, 'rb') as f:
+                return base64.b64encode(f.read()).decode('ascii')
+        if "audioChunks || []).splice(0)" in script:
+            # Periodic drain: report progress, keep the audio for the stop
+            self.chunks += 5
+            return {"data": None, "chunks": 5, "state": "recording"}
+        if "audioChunks.length" in script:
+            self.chunks += 5
+            return self.chunks
+        if "permissionStatus;" in script:
+            return 'success'
+        if "createMediaStreamDestination" in script:
+            return 1  # One remote audio track attached
+        if "startMeetRecording" in script:
+            return 'dialog-shown'
+        return None
+
+    def quit(self):
+        pass
+
+
+def fake_recognize_google(seconds_per_minute):
+    """Build a recognize_google replacement with a fixed cost per audio minute."""
+    def recognize_google(recognizer, audio_data, *args, **kwargs):
+        audio_minutes = len(audio_data.frame_data) / (audio_data.sample_rate * audio_data.sample_width) / 60
+        time.sleep(seconds_per_minute * audio_minutes)
+        # Roughly 150 spoken words per minute
+        return " ".join("word" for _ in range(max(1, int(150 * audio_minutes))))
+    return recognize_google
+
+
+class _ChatCompletionsStub(BaseHTTPRequestHandler):
+    """Minimal OpenAI-style chat completions endpoint."""
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        prompt = payload["messages"][-1]["content"]
+        body = json.dumps({
+            "choices": [{"message": {"role": "assistant", "content": "- Key point\n- Action item\n- Decision"}}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": 12},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _SMTPSink(socketserver.StreamRequestHandler):
+    """Accepts and discards mail: just enough SMTP for smtplib's send_message."""
+
+    def reply(self, line):
+        self.wfile.write((line + "\r\n").encode())
+
+    def handle(self):
+        self.reply("220 localhost sink")
+        while True:
+            line = self.rfile.readline().decode(errors='replace').strip()
+            if not line:
+                return
+            command = line.split(" ", 1)[0].upper()
+            if command == "EHLO":
+                self.reply("250-localhost")
+                self.reply("250 AUTH PLAIN LOGIN")
+            elif command == "AUTH":
+                self.reply("235 Authentication successful")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline().rstrip(b"\r\n") != b".":
+                    pass
+                self.server.messages += 1
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+def start_stubs():
+    """Start the chat completions and SMTP stand-ins on free local ports."""
+    http_server = ThreadingHTTPServer(("127.0.0.1", 0), _ChatCompletionsStub)
+    smtp_server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SMTPSink)
+    smtp_server.daemon_threads = True
+    smtp_server.messages = 0
+    for server in (http_server, smtp_server):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    config.GROQ_API_KEY = "benchmark"
+    config.GROQ_API_URL = f"http://127.0.0.1:{http_server.server_address[1]}/openai/v1/chat/completions"
+    config.EMAIL_HOST = "127.0.0.1"
+    config.EMAIL_PORT = smtp_server.server_address[1]
+    config.EMAIL_USE_TLS = False
+    config.EMAIL_HOST_USER = "bot@example.com"
+    config.EMAIL_HOST_PASSWORD = "benchmark"
+    return http_server, smtp_server
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process and its finished children (ffmpeg) in MB."""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024  # bytes on macOS, KB elsewhere
+    return own / scale, children / scale
+
+
+def bench_meeting(minutes, workdir, silence_ratio, recognizer_cost, recipients):
+    """Run capture -> transcribe -> summarize -> mail for one synthetic meeting."""
+    # Runs in a fresh process so peak RSS belongs to this meeting length only
+    http_server, smtp_server = start_stubs()
+
+    import transcriber
+    from summarizer import generate_summary
+    from mailer import send_summary_emails
+
+    transcriber.sr.Recognizer.recognize_google = fake_recognize_google(recognizer_cost)
+    # Don't wait out record_audio's real-time recording loop
+    transcriber.time = types.SimpleNamespace(sleep=lambda seconds: None,
+                                             strftime=time.strftime, time=time.time)
+
+    audio_file = os.path.join(workdir, f"synthetic_{minutes}min.webm")
+    if not os.path.exists(audio_file):
+        make_synthetic_audio(audio_file, minutes, silence_ratio)
+
+    output_dir = tempfile.mkdtemp(dir=workdir)
+    timings = {}
+
+    started = time.perf_counter()
+    transcript = transcriber.record_and_transcribe(minutes * 60, FakeDriver(audio_file), output_dir, "webaudio")
+    timings["record_and_transcribe"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    summary = generate_summary(transcript)
+    timings["generate_summary"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    send_summary_emails([f"user{i}@example.com" for i in range(recipients)], summary, "https://meet.google.com/bench")
+    timings["send_summary_emails"] = time.perf_counter() - started
+
+    http_server.shutdown()
+    smtp_server.shutdown()
+
+    rss, child_rss = peak_rss_mb()
+    total = sum(timings.values())
+    return {
+        "minutes": minutes,
+        "timings": timings,
+        "total": total,
+        "peak_rss_mb": rss,
+        "peak_child_rss_mb": child_rss,
+        "audio_minutes_per_second": minutes / total if total else 0,
+        "transcript_chars": len(transcript),
+        "emails_delivered": smtp_server.messages,
+    }
+
+
+def run_benchmark(durations, silence_ratio=0.3, recognizer_cost=0.5, recipients=5, workdir=None):
+    """Benchmark the pipeline for each meeting length and print a report."""
+    workdir = workdir or tempfile.mkdtemp(prefix="meetbot-bench-")
+    results = []
+    for minutes in durations:
+        print(f"Benchmarking a {minutes}-minute meeting...")
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            results.append(pool.submit(bench_meeting, minutes, workdir, silence_ratio,
+                                       recognizer_cost, recipients).result())
+
+    print("\n" + "=" * 96)
+    print(f"{'Meeting':>8}{'Capture+STT':>14}{'Summary':>10}{'Email':>9}{'Total':>9}"
+          f"{'Peak RSS':>11}{'ffmpeg RSS':>12}{'Audio min/s':>13}{'Mails':>7}")
+    print("=" * 96)
+    for r in results:
+        t = r["timings"]
+        print(f"{r['minutes']:>6}m {t['record_and_transcribe']:>13.2f}s{t['generate_summary']:>9.3f}s"
+              f"{t['send_summary_emails']:>8.3f}s{r['total']:>8.2f}s{r['peak_rss_mb']:>9.0f}MB"
+              f"{r['peak_child_rss_mb']:>10.0f}MB{r['audio_minutes_per_second']:>13.1f}{r['emails_delivered']:>7}")
+    print("=" * 96)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='End-to-end pipeline benchmark with local stand-ins')
+    parser.add_argument('--durations', type=int, nargs='+', default=DEFAULT_DURATIONS, help='Meeting lengths in minutes')
+    parser.add_argument('--silence-ratio', type=float, default=0.3, help='Fraction of the synthetic audio that is silent')
+    parser.add_argument('--recognizer-cost', type=float, default=0.5, help='Fake recognizer seconds per audio minute')
+    parser.add_argument('--recipients', type=int, default=5, help='Number of summary emails to send')
+    parser.add_argument('--workdir', type=str, default=None, help='Where to keep synthetic audio (reused between runs)')
+    parser.add_argument('--json', type=str, default=None, help='Also write the raw results to this file')
+
+    args = parser.parse_args()
+
+    results = run_benchmark(args.durations, args.silence_ratio, args.recognizer_cost, args.recipients, args.workdir)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
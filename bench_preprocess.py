@@ -0,0 +1,93 @@
+import os
+import json
+import time
+import argparse
+import resource
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from bench_pipeline import make_synthetic_audio, peak_rss_mb
+
+DEFAULT_DURATIONS = [1, 10, 30, 60]  # Recording lengths in minutes
+
+
+def bench_ffmpeg(audio_file):
+    """Old path: ffmpeg filters to a WAV file, then speech_recognition reads it back."""
+    import speech_recognition as sr
+    from transcriber import convert_audio_with_ffmpeg
+
+    started = time.perf_counter()
+    wav_file = convert_audio_with_ffmpeg(audio_file, os.path.splitext(audio_file)[0] + ".bench.wav")
+    recognizer = sr.Recognizer()
+    with sr.AudioFile(wav_file) as source:
+        recognizer.adjust_for_ambient_noise(source)
+        audio_data = recognizer.record(source)
+    elapsed = time.perf_counter() - started
+    os.remove(wav_file)
+    return elapsed, len(audio_data.frame_data)
+
+
+def bench_numpy(audio_file):
+    """New path: ffmpeg only decodes, NumPy does the rest in process, a piece at a time."""
+    from audio_preprocess import preprocess_pieces
+    from transcriber import SEGMENT_SECONDS
+
+    started = time.perf_counter()
+    pcm_bytes = 0
+    for _, _, audio_data, _ in preprocess_pieces(audio_file, SEGMENT_SECONDS):
+        pcm_bytes += len(audio_data.frame_data)
+    return time.perf_counter() - started, pcm_bytes
+
+
+def bench_one(path_name, audio_file):
+    # Runs in a fresh process so peak RSS belongs to this path only
+    elapsed, pcm_bytes = {"ffmpeg": bench_ffmpeg, "numpy": bench_numpy}[path_name](audio_file)
+    rss, child_rss = peak_rss_mb()
+    cpu = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        "path": path_name,
+        "elapsed": elapsed,
+        "cpu_seconds": cpu.ru_utime + cpu.ru_stime + children.ru_utime + children.ru_stime,
+        "pcm_bytes": pcm_bytes,
+        "peak_rss_mb": rss,
+        "peak_child_rss_mb": child_rss,
+    }
+
+
+def run_benchmark(durations, workdir=None):
+    """Time both preprocessing paths for each recording length and print a report."""
+    workdir = workdir or tempfile.mkdtemp(prefix="meetbot-bench-")
+    results = []
+    for minutes in durations:
+        audio_file = os.path.join(workdir, f"synthetic_{minutes}min.webm")
+        if not os.path.exists(audio_file):
+            print(f"Generating a {minutes}-minute recording...")
+            make_synthetic_audio(audio_file, minutes)
+        for path_name in ("ffmpeg", "numpy"):
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                result = pool.submit(bench_one, path_name, audio_file).result()
+            result["minutes"] = minutes
+            results.append(result)
+
+    print("\n" + "=" * 78)
+    print(f"{'Audio':>7}{'Path':>8}{'Wall':>10}{'CPU':>10}{'Realtime x':>12}{'Peak RSS':>11}{'ffmpeg RSS':>12}")
+    print("=" * 78)
+    for r in results:
+        print(f"{r['minutes']:>5}m {r['path']:>8}{r['elapsed']:>9.2f}s{r['cpu_seconds']:>9.2f}s"
+              f"{r['minutes'] * 60 / r['elapsed']:>12.0f}{r['peak_rss_mb']:>9.0f}MB{r['peak_child_rss_mb']:>10.0f}MB")
+    print("=" * 78)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare ffmpeg filtering with in-process NumPy preprocessing')
+    parser.add_argument('--durations', type=int, nargs='+', default=DEFAULT_DURATIONS, help='Recording lengths in minutes')
+    parser.add_argument('--workdir', type=str, default=None, help='Where to keep synthetic audio (reused between runs)')
+    parser.add_argument('--json', type=str, default=None, help='Also write the raw results to this file')
+
+    args = parser.parse_args()
+
+    results = run_benchmark(args.durations, args.workdir)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import subprocess
+from transcriber import (start_recording, drain_chunks, stop_recording, _finish_silence_gate,
+                         CAPTURE_PROFILES, MAX_RECORDING_SECONDS)
+from instrumentation import span, count
+
+# How often the page is checked (and recorded chunks moved to disk)
+HEARTBEAT_SECONDS = 5
+
+# MediaRecorder emits a chunk every second, so this long without audio
+# while not paused by the silence gate means the capture is dead
+STALL_SECONDS = 15
+
+MAX_RESTARTS = 5
+
+
+class CaptureWatchdog:
+    """Keeps a meeting recording alive across browser and driver failures.
+
+    Audio is drained to disk on every heartbeat, so a crash only loses the
+    last few seconds. When the page stops answering or stops producing
+    audio, the bot re-joins (relaunching Chrome if the driver is gone) and
+    recording continues in a new part. Parts are stitched together at the
+    end and the holes between them are written to <output>.gaps.json.
+    """
+
+    def __init__(self, bot, heartbeat_seconds=HEARTBEAT_SECONDS, stall_seconds=STALL_SECONDS,
+                 max_restarts=MAX_RESTARTS):
+        self.bot = bot
+        self.heartbeat_seconds = heartbeat_seconds
+        self.stall_seconds = stall_seconds
+        self.max_restarts = max_restarts
+
+    def record(self, duration, output_file):
+        """Record for duration seconds into output_file. Returns the path or None."""
+        record_seconds = min(duration, MAX_RECORDING_SECONDS)
+        stem, ext = os.path.splitext(output_file)
+        started = time.time()
+        deadline = started + record_seconds
+        parts = []
+        gaps = []
+
+        while time.time() < deadline:
+            part_file = f"{stem}.part{len(gaps) + 1}{ext}"
+            part_start = time.time()
+            written, failure, last_audio = self._record_part(part_file, deadline)
+            if written:
+                parts.append((part_file, (part_start - started) * 1000))
+            elif os.path.exists(part_file):
+                os.remove(part_file)
+            if not failure:
+                break
+
+            print(f"Capture failed after {time.time() - part_start:.0f}s: {failure}")
+            # Audio after the last successful drain never reached disk
+            if len(gaps) >= self.max_restarts:
+                print(f"Giving up after {self.max_restarts} restart(s)")
+                gaps.append(self._gap(started, last_audio, deadline, failure))
+                break
+            self._reattach()
+            gaps.append(self._gap(started, last_audio, min(time.time(), deadline), failure))
+
+        if gaps:
+            count("capture_restarts", len(gaps))
+            count("capture_gap_ms", sum(gap["end_ms"] - gap["start_ms"] for gap in gaps))
+        if not parts:
+            print("ERROR: No audio data was captured")
+            return None
+
+        self._merge_speech(parts, gaps, output_file)
+        self._merge_parts([part for part, _ in parts], output_file)
+        if gaps:
+            gaps_file = stem + ".gaps.json"
+            with open(gaps_file, 'w') as f:
+                json.dump({"restarts": len(gaps), "gaps": gaps}, f, indent=2)
+            lost = sum(gap["end_ms"] - gap["start_ms"] for gap in gaps) / 1000
+            print(f"Recovered from {len(gaps)} capture failure(s), {lost:.1f}s missing -> {gaps_file}")
+        return output_file
+
+    def _gap(self, started, lost_from, resumed_at, reason):
+        return {
+            "start_ms": round((lost_from - started) * 1000),
+            "end_ms": round((resumed_at - started) * 1000),
+            "reason": reason,
+        }
+
+    def _record_part(self, part_file, deadline):
+        """Record until the deadline or a failure.
+
+        Returns (bytes written, failure or None, time the last drained audio
+        was safely on disk).
+        """
+        bot = self.bot
+        written = 0
+        last_audio = time.time()
+        try:
+            gate_options = start_recording(bot.driver, bot.capture_mode, bot.capture_profile,
+                                           bot.silence_gate)
+        except Exception as e:
+            return 0, f"driver error: {e}", last_audio
+        if gate_options is None:
+            return 0, "capture did not start", last_audio
+        if not bot.roster_tracking:
+            # Only now that audio is being recorded
+            bot.start_roster_tracking()
+
+        with open(part_file, 'wb') as audio_out:
+            try:
+                last_audio = time.time()
+                while time.time() < deadline:
+                    time.sleep(max(min(self.heartbeat_seconds, deadline - time.time()), 0))
+                    drained, _, state = drain_chunks(bot.driver, audio_out)
+                    written += drained
+                    bot.poll_roster()
+
+                    if state == 'inactive':
+                        return written, "recorder stopped", last_audio
+                    if drained or state == 'paused':
+                        last_audio = time.time()
+                    elif time.time() - last_audio > self.stall_seconds:
+                        return written, f"no audio for {self.stall_seconds}s", last_audio
+
+                if gate_options:
+                    _finish_silence_gate(bot.driver, part_file, gate_options)
+                written += stop_recording(bot.driver, audio_out)
+            except Exception as e:
+                return written, f"driver error: {e}", last_audio
+        return written, None, time.time()
+
+    def _driver_alive(self):
+        try:
+            self.bot.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _reattach(self):
+        """Get the bot back into the meeting, relaunching Chrome only if the driver is gone."""
+        bot = self.bot
+        with span("capture_recovery") as recovery:
+            relaunch = not bot.driver or not self._driver_alive()
+            recovery.set(relaunch=relaunch)
+            try:
+                if relaunch:
+                    try:
+                        bot.driver.quit()
+                    except Exception:
+                        pass
+                    # Same profile, so the Google login survives the relaunch
+                    bot.setup_driver()
+                bot.join_meeting(bot.meet_url)
+                # The re-joined page has no tracker; the next part starts one
+                # once it is recording
+                bot.roster_tracking = False
+            except Exception as e:
+                print(f"Could not re-join the meeting: {e}")
+                # Don't burn through the restarts while Chrome is unavailable
+                time.sleep(self.heartbeat_seconds)
+
+    def _merge_speech(self, parts, gaps, output_file):
+        # Each part's silence gate counted from its own start; shift the
+        # segments onto the meeting timeline and the merged file
+        segments = []
+        paused = False
+        file_shift = 0
+        for part_file, part_offset_ms in parts:
+            speech_file = os.path.splitext(part_file)[0] + ".speech.json"
+            if not os.path.exists(speech_file):
+                continue
+            with open(speech_file) as f:
+                speech = json.load(f)
+            os.remove(speech_file)
+
+            paused = speech["paused"]
+            missing_ms = sum(gap["end_ms"] - gap["start_ms"] for gap in gaps if gap["end_ms"] <= part_offset_ms)
+            if not paused:
+                file_shift = part_offset_ms - missing_ms
+            for segment in speech["segments"]:
+                segments.append({
+                    "start_ms": round(segment["start_ms"] + part_offset_ms),
+                    "end_ms": round(segment["end_ms"] + part_offset_ms),
+                    "file_start_ms": round(segment["file_start_ms"] + file_shift),
+                })
+            if paused:
+                file_shift += sum(s["end_ms"] - s["start_ms"] for s in speech["segments"])
+
+        if segments:
+            with open(os.path.splitext(output_file)[0] + ".speech.json", 'w') as f:
+                json.dump({"paused": paused, "segments": segments}, f, indent=2)
+
+    def _merge_parts(self, part_files, output_file):
+        if len(part_files) == 1:
+            os.replace(part_files[0], output_file)
+            return
+
+        profile = CAPTURE_PROFILES.get(self.bot.capture_profile, CAPTURE_PROFILES["standard"])
+        inputs = []
+        for part in part_files:
+            inputs += ["-i", part]
+        streams = "".join(f"[{i}:a]" for i in range(len(part_files)))
+        try:
+            with span("merge_capture_parts", parts=len(part_files)):
+                subprocess.run(["ffmpeg", "-y"] + inputs + [
+                    "-filter_complex", f"{streams}concat=n={len(part_files)}:v=0:a=1[a]",
+                    "-map", "[a]",
+                    "-c:a", "libopus",
+                    "-b:a", str(profile["bitrate"]),
+                    output_file
+                ], check=True, capture_output=True)
+        except (subprocess.CalledProcessError, OSError) as e:
+            # Better the first stretch of the meeting than nothing
+            print(f"Could not merge {len(part_files)} capture parts, keeping only the first: {e}")
+            os.replace(part_files[0], output_file)
+            return
+
+        for part in part_files:
+            os.remove(part)
+        print(f"Merged {len(part_files)} capture parts into {output_file}")
@@ -0,0 +1,179 @@
+import sys
+import argparse
+import importlib
+
+# The module each subcommand needs. Nothing is imported until the subcommand
+# runs, so working with existing files never pays for selenium and Chrome.
+STAGE_MODULES = {
+    "join": "meetbot",
+    "schedule": "scheduler",
+    "transcribe": "transcriber",
+    "summarize": "summarizer",
+    "mail": "mailer",
+    "batch": "batch",
+    "search": "store",
+    "prune": "archive",
+}
+
+
+def import_stage(stage):
+    """Import (once) and return the module behind a subcommand."""
+    return importlib.import_module(STAGE_MODULES[stage])
+
+
+def _read_text(path):
+    if path == "-":
+        return sys.stdin.read()
+    with open(path) as f:
+        return f.read()
+
+
+def _write_or_print(text, path):
+    if path:
+        with open(path, 'w') as f:
+            f.write(text)
+        print(f"Saved to {path}")
+    else:
+        print(text)
+
+
+def cmd_join(args):
+    meetbot = import_stage("join")
+    if args.trace_file or args.metrics_file:
+        import instrumentation
+        instrumentation.configure(args.trace_file, args.metrics_file)
+
+    bot = meetbot.GoogleMeetBot(capture_mode=args.capture_mode, capture_profile=args.capture_profile,
+                                silence_gate=args.silence_gate, watchdog=args.watchdog)
+    transcript = bot.run_meeting_bot(args.url, args.duration)
+    print("\nRaw Transcript:")
+    print("=" * 60)
+    print(transcript)
+    print("=" * 60)
+
+
+def cmd_schedule(args):
+    scheduler = import_stage("schedule")
+    scheduler.run_scheduler(scheduler.load_jobs(args.jobs), args.output_dir,
+                            max_workers=args.max_workers,
+                            memory_limit_mb=args.memory_limit,
+                            max_load=args.max_load,
+                            profile_template=args.profile_template)
+
+
+def cmd_transcribe(args):
+    transcriber = import_stage("transcribe")
+    transcript = transcriber.transcribe_audio(args.file)
+    _write_or_print(transcript, args.output)
+
+
+def cmd_summarize(args):
+    summarizer = import_stage("summarize")
+    summary = summarizer.generate_summary(_read_text(args.transcript))
+    _write_or_print(summary, args.output)
+
+
+def cmd_mail(args):
+    mailer = import_stage("mail")
+    recipients = args.to
+    if not recipients:
+        import config
+        recipients = [config.EMAIL_HOST_USER]
+    mailer.send_summary_emails(recipients, _read_text(args.summary), args.url)
+
+
+def cmd_batch(args):
+    batch = import_stage("batch")
+    batch.run_batch(args.directory, args.summarize, args.workers, args.recursive, args.retry_empty)
+
+
+def cmd_search(args):
+    import time
+    store = import_stage("search")
+    since = time.time() - args.days * 86400 if args.days else None
+    with store.TranscriptStore() as transcripts:
+        store.print_hits(transcripts.search(args.query, args.limit, since, args.url))
+
+
+def cmd_prune(args):
+    archive = import_stage("prune")
+    archive.enforce_retention(args.archive_dir, args.max_age_days, args.max_total_mb)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Google Meet Bot')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    join = subparsers.add_parser('join', help='Join a meeting, record it and mail the transcript')
+    join.add_argument('--url', type=str, required=True, help='Google Meet URL')
+    join.add_argument('--duration', type=int, default=60, help='Meeting duration in minutes')
+    join.add_argument('--capture-mode', choices=['display', 'webaudio'], default='display',
+                      help="'display' shares the tab (needs approval), 'webaudio' taps Meet's audio directly")
+    # Kept as a literal list so --help doesn't have to import the transcriber
+    join.add_argument('--capture-profile', choices=['standard', 'speech32', 'speech24', 'speech16'],
+                      default='standard', help='Encoder settings for the captured audio')
+    join.add_argument('--silence-gate', action='store_true',
+                      help='Pause recording during silence and save speech timestamps')
+    join.add_argument('--watchdog', action='store_true',
+                      help='Re-join and resume recording if the browser crashes (best with webaudio)')
+    join.add_argument('--trace-file', type=str, default=None, help='Write stage timings as JSON lines to this file')
+    join.add_argument('--metrics-file', type=str, default=None, help='Write a Prometheus textfile with stage totals')
+    join.set_defaults(func=cmd_join)
+
+    schedule = subparsers.add_parser('schedule', help='Run a file of meeting jobs concurrently')
+    schedule.add_argument('jobs', type=str, help='CSV or JSON-lines job file (url,start,duration); - for stdin')
+    schedule.add_argument('--output-dir', type=str, default='meetbot-runs', help='Base directory for per-job output')
+    schedule.add_argument('--max-workers', type=int, default=None, help='Upper bound on concurrent bots')
+    schedule.add_argument('--memory-limit', type=int, default=None, help='Per-bot memory limit in MB')
+    schedule.add_argument('--max-load', type=float, default=None, help='Hold new jobs while load average is above this')
+    schedule.add_argument('--profile-template', type=str, default=None,
+                          help='Logged-in Chrome profile to copy for each worker slot')
+    schedule.set_defaults(func=cmd_schedule)
+
+    transcribe = subparsers.add_parser('transcribe', help='Transcribe an existing recording')
+    transcribe.add_argument('file', type=str, help='WebM or WAV recording')
+    transcribe.add_argument('--output', '-o', type=str, default=None, help='Write the transcript here instead of stdout')
+    transcribe.set_defaults(func=cmd_transcribe)
+
+    summarize = subparsers.add_parser('summarize', help='Summarize an existing transcript')
+    summarize.add_argument('transcript', type=str, help='Transcript text file (- for stdin)')
+    summarize.add_argument('--output', '-o', type=str, default=None, help='Write the summary here instead of stdout')
+    summarize.set_defaults(func=cmd_summarize)
+
+    mail = subparsers.add_parser('mail', help='Email a summary to participants')
+    mail.add_argument('summary', type=str, help='Summary text file (- for stdin)')
+    mail.add_argument('--to', action='append', default=[], help='Recipient (repeatable, default: the bot account)')
+    mail.add_argument('--url', type=str, default='', help='Meeting link to include in the email')
+    mail.set_defaults(func=cmd_mail)
+
+    batch = subparsers.add_parser('batch', help='Reprocess a directory of archived recordings in parallel')
+    batch.add_argument('directory', type=str, help='Directory containing meet_audio_*.webm / fallback_audio_*.wav')
+    batch.add_argument('--summarize', action='store_true', help='Also generate a summary for each transcript')
+    batch.add_argument('--workers', type=int, default=None, help='Worker processes (default: available cores)')
+    batch.add_argument('--recursive', action='store_true', help='Search subdirectories too')
+    batch.add_argument('--retry-empty', action='store_true', help='Redo recordings whose transcript came out empty')
+    batch.set_defaults(func=cmd_batch)
+
+    search = subparsers.add_parser('search', help='Full-text search over every stored transcript and summary')
+    search.add_argument('query', type=str, help='Words to search for')
+    search.add_argument('--limit', type=int, default=20, help='Maximum number of hits')
+    search.add_argument('--days', type=int, default=None, help='Only meetings from the last N days')
+    search.add_argument('--url', type=str, default=None, help='Only this meeting link')
+    search.set_defaults(func=cmd_search)
+
+    prune = subparsers.add_parser('prune', help='Apply the archive retention policy')
+    prune.add_argument('--archive-dir', type=str, default=None, help='Archive directory (default: config.ARCHIVE_DIR)')
+    prune.add_argument('--max-age-days', type=float, default=None, help='Remove bundles older than this')
+    prune.add_argument('--max-total-mb', type=float, default=None, help='Keep the archive under this size')
+    prune.set_defaults(func=cmd_prune)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+import re
+import time
+import sqlite3
+import difflib
+import unicodedata
+import config
+
+# How close a fuzzy match must be (0-1) before it is trusted without asking
+FUZZY_CUTOFF = 0.88
+
+
+def normalize_name(name):
+    """Normalize a display name for lookups: no accents, punctuation or case.
+
+    Letters and digits of any script are kept, so 'Иван Петров' or '张伟'
+    resolve like Latin names do.
+    """
+    name = unicodedata.normalize('NFKD', name or '')
+    name = ''.join(ch for ch in name if not unicodedata.combining(ch))
+    name = re.sub(r"\(.*?\)", " ", name.casefold())  # "(Host)", "(Guest)" and friends
+    name = re.sub(r"[\W_]+", " ", name)
+    return ' '.join(name.split())
+
+
+def sorted_key(normalized):
+    """Word-order independent key, so 'Smith John' finds 'John Smith'."""
+    return ' '.join(sorted(normalized.split()))
+
+
+def aliases_for_email(email):
+    """Names implied by an address, e.g. jane.doe@x.com -> 'jane doe'."""
+    local = email.split('@', 1)[0]
+    alias = normalize_name(re.sub(r"[._\-+]+", " ", local))
+    return [alias] if len(alias.split()) > 1 else []
+
+
+def guess_email(name):
+    """Fallback guess of first.last@domain used by the 'guess' policy.
+
+    None when the name has nothing to build an ASCII address from.
+    """
+    name_parts = normalize_name(name).split()
+    if not name_parts or not all(part.isascii() for part in name_parts):
+        return None
+    suggested_email = name_parts[0]
+    if len(name_parts) > 1:
+        suggested_email += f".{name_parts[-1]}"
+    return suggested_email + "@" + getattr(config, 'EMAIL_GUESS_DOMAIN', 'gmail.com')
+
+
+class EmailDirectory:
+    """Persistent name -> email directory backed by SQLite.
+
+    Every confirmed mapping is stored with its normalized name, a word-order
+    independent key and aliases derived from the address, all indexed, so
+    scraped display names resolve in bulk without prompting anyone.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or getattr(config, 'DIRECTORY_DB', 'directory.db')
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS people (
+                email TEXT PRIMARY KEY,
+                display_name TEXT,
+                updated_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS aliases (
+                alias TEXT NOT NULL,
+                sorted_alias TEXT NOT NULL,
+                email TEXT NOT NULL REFERENCES people(email) ON DELETE CASCADE,
+                PRIMARY KEY (alias, email)
+            );
+            CREATE INDEX IF NOT EXISTS aliases_sorted ON aliases(sorted_alias);
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def learn(self, name, email, aliases=()):
+        """Record a confirmed name -> email mapping (plus any extra aliases)."""
+        email = email.strip().lower()
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO people (email, display_name, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(email) DO UPDATE SET display_name = excluded.display_name, "
+                "updated_at = excluded.updated_at",
+                (email, name, time.time()))
+
+            for alias in {normalize_name(a) for a in (name, *aliases)} | set(aliases_for_email(email)):
+                if alias:
+                    self.conn.execute(
+                        "INSERT OR IGNORE INTO aliases (alias, sorted_alias, email) VALUES (?, ?, ?)",
+                        (alias, sorted_key(alias), email))
+
+    def forget(self, email):
+        """Remove an address and all of its aliases."""
+        with self.conn:
+            self.conn.execute("DELETE FROM aliases WHERE email = ?", (email.lower(),))
+            self.conn.execute("DELETE FROM people WHERE email = ?", (email.lower(),))
+
+    def _unique(self, rows):
+        emails = {row[0] for row in rows}
+        return emails.pop() if len(emails) == 1 else None
+
+    def lookup(self, name, _candidates=None):
+        """Resolve one display name, or None if it is unknown or ambiguous."""
+        alias = normalize_name(name)
+        if not alias:
+            return None
+
+        # Exact alias, then the same words in another order (both indexed)
+        email = self._unique(self.conn.execute(
+            "SELECT email FROM aliases WHERE alias = ?", (alias,)))
+        if email:
+            return email
+        email = self._unique(self.conn.execute(
+            "SELECT email FROM aliases WHERE sorted_alias = ?", (sorted_key(alias),)))
+        if email:
+            return email
+
+        # Fuzzy match for typos, nicknames with an extra letter and the like
+        if _candidates is None:
+            _candidates = self._candidates()
+        matches = difflib.get_close_matches(sorted_key(alias), _candidates.keys(), n=2, cutoff=FUZZY_CUTOFF)
+        if len(matches) == 1 and len(_candidates[matches[0]]) == 1:
+            return next(iter(_candidates[matches[0]]))
+        return None
+
+    def _candidates(self):
+        candidates = {}
+        for sorted_alias, email in self.conn.execute("SELECT sorted_alias, email FROM aliases"):
+            candidates.setdefault(sorted_alias, set()).add(email)
+        return candidates
+
+    def resolve_many(self, names):
+        """Resolve a batch of display names. Returns {name: email or None}."""
+        # Load the fuzzy candidate set once for the whole batch
+        candidates = self._candidates()
+        return {name: self.lookup(name, candidates) for name in names}
+
+
+def _ask_for_emails(policy):
+    # Fallback when the roster couldn't be read: ask for addresses by hand
+    print("\nCouldn't automatically extract participants.")
+    print("Please enter email addresses manually.\n")
+
+    emails = [config.EMAIL_HOST_USER]  # Always include the default
+
+    # Unattended runs can't answer prompts - stick with the default
+    while policy == 'prompt':
+        email = input("Enter participant email (or press Enter to finish): ").strip()
+        if not email:
+            break
+        if "@" in email:
+            emails.append(email)
+            print(f"Added {email} to recipients list")
+        else:
+            print("Invalid email format. Please include @ symbol.")
+    return emails
+
+
+def unattended_policy(policy=None):
+    """A directory policy that never prompts: the given one, else the configured one, else 'skip'."""
+    for candidate in (policy, getattr(config, 'DIRECTORY_POLICY', 'prompt')):
+        if candidate in ('guess', 'skip'):
+            return candidate
+    return 'skip'
+
+
+def resolve_recipients(participants_data, policy=None):
+    """Turn a meeting roster into summary recipients.
+
+    participants_data is the list of participant dicts read from the page
+    (None if it couldn't be read). Names are resolved against the directory
+    in one batch; unknown names follow config.DIRECTORY_POLICY. Returns a
+    de-duplicated list of emails that always includes EMAIL_HOST_USER.
+    """
+    policy = policy or getattr(config, 'DIRECTORY_POLICY', 'prompt')
+    if participants_data is None:
+        emails = _ask_for_emails(policy)
+    else:
+        emails = []
+
+    if participants_data:
+        print(f"\nFound {len(participants_data)} participants:")
+        print("=" * 50)
+
+        with EmailDirectory() as directory:
+            resolved = directory.resolve_many(
+                [p.get('name', 'Unknown') for p in participants_data if not p.get('isYou')])
+
+            for idx, participant in enumerate(participants_data):
+                name = participant.get('name', 'Unknown')
+                is_you = participant.get('isYou', False)
+                is_host = participant.get('isHost', False)
+
+                print(f"{idx + 1}. {name}" +
+                      (" (YOU)" if is_you else "") +
+                      (" (Host)" if is_host else "") +
+                      (" (left early)" if participant.get('present') is False else ""))
+
+                # For yourself, use the config email
+                if is_you:
+                    emails.append(config.EMAIL_HOST_USER)
+                    continue
+
+                if resolved.get(name):
+                    emails.append(resolved[name])
+                    print(f"Resolved {name} -> {resolved[name]} from directory")
+                    continue
+
+                suggested_email = guess_email(name)
+                if policy == 'guess' and suggested_email:
+                    emails.append(suggested_email)
+                    print(f"Guessed {suggested_email} for {name}")
+                    continue
+                if policy != 'prompt':
+                    print(f"No directory entry for {name}, skipping")
+                    continue
+
+                # Unknown name - ask, and remember the answer next time
+                want_email = input(f"\nInclude {name} in email recipients? (y/n): ").lower().startswith('y')
+                if want_email:
+                    default = f" [default: {suggested_email}]" if suggested_email else ""
+                    email = input(f"Enter email for {name}{default}: ").strip() or suggested_email
+                    while not email or "@" not in email:
+                        print("Invalid email format. Please include @ symbol.")
+                        email = input(f"Enter email for {name}: ").strip()
+                    emails.append(email)
+                    directory.learn(name, email)
+                    print(f"Added {email} to recipients list")
+
+        print("=" * 50)
+    elif participants_data is not None:
+        print("No participants found in the panel")
+
+    # Always include default email if not already in list
+    if config.EMAIL_HOST_USER not in emails:
+        emails.append(config.EMAIL_HOST_USER)
+
+    # Remove duplicates while preserving order
+    recipients = list(dict.fromkeys(emails))
+
+    print(f"\nWill send transcript to {len(recipients)} recipient(s):")
+    for email in recipients:
+        print(f"- {email}")
+    return recipients
+
+
+if __name__ == "__main__":
+    import csv
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Manage the participant email directory')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    add_parser = subparsers.add_parser('add', help='Add a confirmed name -> email mapping')
+    add_parser.add_argument('name')
+    add_parser.add_argument('email')
+    add_parser.add_argument('--alias', action='append', default=[], help='Extra name this person appears as')
+    import_parser = subparsers.add_parser('import', help='Bulk-load a CSV with name,email columns')
+    import_parser.add_argument('csv_file')
+    lookup_parser = subparsers.add_parser('lookup', help='Resolve display names')
+    lookup_parser.add_argument('names', nargs='+')
+
+    args = parser.parse_args()
+
+    with EmailDirectory() as directory:
+        if args.command == 'add':
+            directory.learn(args.name, args.email, args.alias)
+            print(f"Added {args.name} -> {args.email}")
+        elif args.command == 'import':
+            with open(args.csv_file, newline='') as f:
+                rows = [row for row in csv.DictReader(f) if row.get('name') and row.get('email')]
+            for row in rows:
+                directory.learn(row['name'], row['email'])
+            print(f"Imported {len(rows)} mapping(s)")
+        else:
+            for name, email in directory.resolve_many(args.names).items():
+                print(f"{name}: {email or 'UNRESOLVED'}")
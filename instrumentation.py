@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import atexit
+import tempfile
+import threading
+
+# Tracing is off unless a trace file and/or Prometheus textfile is configured,
+# either through configure() or these environment variables.
+TRACE_FILE_ENV = "MEETBOT_TRACE_FILE"
+PROM_FILE_ENV = "MEETBOT_PROM_FILE"
+
+# Set by the first process to enable metrics. Child processes (scheduler
+# and batch workers) inherit it and write their own per-pid textfile.
+PROM_OWNER_ENV = "MEETBOT_PROM_OWNER"
+
+
+class _NullSpan:
+    """Stand-in returned while tracing is disabled - does nothing, allocates nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """Times one pipeline stage and records it when the block exits."""
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._t0
+        if exc_type is not None:
+            self.attrs["error"] = f"{exc_type.__name__}: {exc}"
+        self.tracer._record_span(self, duration)
+        return False
+
+    def set(self, **attrs):
+        """Attach extra attributes (sizes, counts, ...) to the span."""
+        self.attrs.update(attrs)
+
+
+class Tracer:
+    """Writes spans as JSON lines and keeps counters for a Prometheus textfile."""
+
+    def __init__(self, trace_file=None, prom_file=None):
+        self.trace_file = trace_file
+        self.prom_file = prom_file
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.span_totals = {}  # name -> [count, total seconds]
+        self._trace = open(trace_file, 'a', buffering=1) if trace_file else None
+        self.pid = os.getpid()
+        if prom_file:
+            os.environ.setdefault(PROM_OWNER_ENV, str(self.pid))
+
+    def span(self, name, **attrs):
+        return Span(self, name, attrs)
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def _record_span(self, span, duration):
+        with self.lock:
+            totals = self.span_totals.setdefault(span.name, [0, 0.0])
+            totals[0] += 1
+            totals[1] += duration
+            if self._trace:
+                self._trace.write(json.dumps({
+                    "span": span.name,
+                    "start": span.start,
+                    "duration_ms": round(duration * 1000, 3),
+                    "pid": os.getpid(),
+                    "attrs": span.attrs,
+                }, default=str) + "\n")
+
+    def _forked(self):
+        # A forked worker starts from zero, or it would re-export the
+        # parent's totals under its own pid
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.span_totals = {}
+
+    def _prom_target(self):
+        """(textfile path, extra labels) for this process."""
+        pid = os.getpid()
+        if pid == self.pid and os.environ.get(PROM_OWNER_ENV) == str(pid):
+            return self.prom_file, ""
+        # A worker: its own file, and a pid label so the series don't clash
+        stem, ext = os.path.splitext(self.prom_file)
+        return f"{stem}.{pid}{ext}", f'pid="{pid}"'
+
+    def flush(self):
+        """Rewrite the Prometheus textfile with the current totals."""
+        if not self.prom_file:
+            return
+        prom_file, pid_label = self._prom_target()
+        counter_labels = f"{{{pid_label}}}" if pid_label else ""
+        stage_labels = f",{pid_label}" if pid_label else ""
+        with self.lock:
+            lines = []
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE meetbot_{name}_total counter")
+                lines.append(f"meetbot_{name}_total{counter_labels} {value}")
+            if self.span_totals:
+                lines.append("# TYPE meetbot_stage_seconds summary")
+                for name, (count, total) in sorted(self.span_totals.items()):
+                    lines.append(f'meetbot_stage_seconds_sum{{stage="{name}"{stage_labels}}} {total:.6f}')
+                    lines.append(f'meetbot_stage_seconds_count{{stage="{name}"{stage_labels}}} {count}')
+
+            # Write then rename so node_exporter never reads a half-written
+            # file; a unique temp file so concurrent flushes can't collide
+            fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(prom_file) or ".", suffix=".tmp")
+            with os.fdopen(fd, 'w') as f:
+                f.write("\n".join(lines) + "\n")
+            os.replace(tmp_file, prom_file)
+
+    def close(self):
+        self.flush()
+        if self._trace:
+            self._trace.close()
+            self._trace = None
+
+
+_tracer = None
+
+
+def configure(trace_file=None, prom_file=None):
+    """Enable tracing to the given files (both None disables it)."""
+    global _tracer
+    if _tracer:
+        _tracer.close()
+    _tracer = Tracer(trace_file, prom_file) if (trace_file or prom_file) else None
+    return _tracer
+
+
+def span(name, **attrs):
+    """Context manager timing a pipeline stage: ``with span("join_meeting"): ...``"""
+    if _tracer is None:
+        return _NULL_SPAN
+    return _tracer.span(name, **attrs)
+
+
+def count(name, value=1):
+    """Add to a named counter (exported as meetbot_<name>_total)."""
+    if _tracer is not None:
+        _tracer.count(name, value)
+
+
+def flush():
+    if _tracer is not None:
+        _tracer.flush()
+
+
+def _after_fork():
+    if _tracer is not None:
+        _tracer._forked()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+@atexit.register
+def _close():
+    if _tracer is not None:
+        _tracer.close()
+
+
+if os.environ.get(TRACE_FILE_ENV) or os.environ.get(PROM_FILE_ENV):
+    configure(os.environ.get(TRACE_FILE_ENV), os.environ.get(PROM_FILE_ENV))
@@ -8,30 +8,176 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
-from transcriber import record_and_transcribe
-from summarizer import generate_summary
+from transcriber import capture_meeting_audio, CAPTURE_PROFILES
 from mailer import send_summary_emails
+from capture_watchdog import CaptureWatchdog
+from noise_profile import capture_source
+from postprocess import run_post_processing
+from instrumentation import span, flush as flush_metrics, configure as configure_tracing
 import config
 import requests
 import undetected_chromedriver as uc
 
+# Shared participant-row parser used by the one-off scrape and the roster tracker
+PARSE_PARTICIPANT_JS = """
+    const parseParticipant = (element) => {
+        // Skip non-participant elements
+        if (!element.textContent || element.textContent.length < 2) {
+            return null;
+        }
+        
+        // Get the name - different Google Meet versions use different structures
+        let name = '';
+        
+        // Try multiple approaches to get the name
+        const nameElement = element.querySelector('[data-participant-name], [data-tooltip], [aria-label]');
+        if (nameElement) {
+            name = nameElement.getAttribute('data-participant-name') || 
+                   nameElement.getAttribute('data-tooltip') || 
+                   nameElement.getAttribute('aria-label') || '';
+        }
+        
+        // If we couldn't get the name from attributes, use the text content
+        if (!name) {
+            name = element.textContent.trim();
+        }
+        
+        // Clean up the name
+        name = name.replace(/\\(You\\)/i, '')
+                   .replace(/\\(Host\\)/i, '')
+                   .replace(/\\(Meeting organizer\\)/i, '')
+                   .replace(/\\s+/g, ' ')
+                   .trim();
+        
+        if (!name) {
+            return null;
+        }
+        return {
+            name: name,
+            isYou: element.textContent.includes('You'),
+            isHost: element.textContent.includes('Host') || 
+                    element.textContent.includes('organizer')
+        };
+    };
+"""
+
+SCRAPE_PARTICIPANTS_JS = PARSE_PARTICIPANT_JS + """
+    // Find all elements that might contain participant info
+    const participants = [];
+    document.querySelectorAll('[role="listitem"]').forEach(element => {
+        const participant = parseParticipant(element);
+        if (participant) {
+            participants.push(participant);
+        }
+    });
+    return participants;
+"""
+
+# Watches the participants panel for the whole meeting and keeps a roster plus
+# a queue of join/leave events that Python drains with POLL_ROSTER_JS.
+ROSTER_TRACKER_JS = PARSE_PARTICIPANT_JS + """
+    if (window.meetRoster) {
+        return true;
+    }
+    const roster = {people: {}, events: []};
+    window.meetRoster = roster;
+    
+    const scan = () => {
+        const items = document.querySelectorAll('[role="listitem"]');
+        // Panel closed or re-rendering - don't mistake that for everyone leaving
+        if (items.length === 0) {
+            return;
+        }
+        
+        const now = Date.now();
+        const present = new Set();
+        items.forEach(element => {
+            const participant = parseParticipant(element);
+            if (!participant) {
+                return;
+            }
+            present.add(participant.name);
+            
+            const person = roster.people[participant.name];
+            if (!person) {
+                roster.people[participant.name] = Object.assign(participant, {
+                    present: true, firstSeen: now, lastSeen: now, leftAt: null
+                });
+                roster.events.push({type: 'join', name: participant.name, at: now});
+            } else {
+                person.lastSeen = now;
+                if (!person.present) {
+                    person.present = true;
+                    person.leftAt = null;
+                    roster.events.push({type: 'join', name: participant.name, at: now});
+                }
+            }
+        });
+        
+        Object.values(roster.people).forEach(person => {
+            if (person.present && !present.has(person.name)) {
+                person.present = false;
+                person.leftAt = now;
+                roster.events.push({type: 'leave', name: person.name, at: now});
+            }
+        });
+    };
+    
+    // Coalesce bursts of DOM mutations into one scan
+    let pending = null;
+    window.meetRosterObserver = new MutationObserver(() => {
+        if (!pending) {
+            pending = setTimeout(() => { pending = null; scan(); }, 500);
+        }
+    });
+    window.meetRosterObserver.observe(document.body, {childList: true, subtree: true, characterData: true});
+    scan();
+    return true;
+"""
+
+POLL_ROSTER_JS = """
+    const roster = window.meetRoster;
+    if (!roster) {
+        return null;
+    }
+    return {events: roster.events.splice(0), people: Object.values(roster.people)};
+"""
+
 class GoogleMeetBot:
-    def __init__(self):
+    def __init__(self, profile_dir=None, output_dir=None, capture_mode="display",
+                 capture_profile="standard", silence_gate=False, watchdog=False):
         self.driver = None
         self.meet_url = None
         self.participants = []
+        # Roster kept up to date in the page while the meeting runs
+        self.roster_tracking = False
+        self.roster = {}
+        self.roster_events = []
+        # Each bot gets its own Chrome profile and output directory so several
+        # bots can run side by side on one host without clobbering each other.
+        self.profile_dir = profile_dir or os.path.join(os.path.expanduser('~'), 'chrome-profile-undetected')
+        self.output_dir = output_dir or os.getcwd()
+        self.capture_mode = capture_mode
+        self.capture_profile = capture_profile
+        self.silence_gate = silence_gate
+        # Re-join and keep recording if Chrome or the driver dies mid-meeting
+        self.watchdog = watchdog
         
     def setup_driver(self):
         try:
             print("Initializing Chrome with proper version matching...")
             
-            user_data_dir = os.path.join(os.path.expanduser('~'), 'chrome-profile-undetected')
+            user_data_dir = self.profile_dir
             os.makedirs(user_data_dir, exist_ok=True)
+            os.makedirs(self.output_dir, exist_ok=True)
             
             # FIX: Specify the correct Chrome version to match your installed browser
             try:
                 # First approach - specify version explicitly for undetected_chromedriver
+                uc_options = uc.ChromeOptions()
+                uc_options.add_argument("--autoplay-policy=no-user-gesture-required")  # Let Web Audio capture start unattended
                 self.driver = uc.Chrome(
+                    options=uc_options,
                     user_data_dir=user_data_dir,
                     browser_executable_path="C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe",
                     version_main=130  # Match your Chrome version (130.0.6723.117)
@@ -50,6 +196,7 @@ class GoogleMeetBot:
                 options.add_argument("--disable-blink-features=AutomationControlled")
                 options.add_argument("--use-fake-ui-for-media-stream")  # Auto accept mic/cam
                 options.add_argument("--enable-usermedia-screen-capturing")  # Enable screen capture
+                options.add_argument("--autoplay-policy=no-user-gesture-required")  # Let Web Audio capture start unattended
                 options.add_experimental_option("excludeSwitches", ["enable-automation"])
                 options.add_experimental_option("useAutomationExtension", False)
                 
@@ -167,7 +314,7 @@ class GoogleMeetBot:
                 print(f"All navigation approaches failed: {e}")
             
             # Take a screenshot to debug
-            screenshot_path = os.path.join(os.getcwd(), "meeting_page.png")
+            screenshot_path = os.path.join(self.output_dir, "meeting_page.png")
             self.driver.save_screenshot(screenshot_path)
             print(f"Screenshot saved to: {screenshot_path}")
             
@@ -224,7 +371,7 @@ class GoogleMeetBot:
                     # Click anywhere on the page to ensure focus
                     self.driver.find_element(By.TAG_NAME, "body").click()
                     # Take a screenshot to verify current state
-                    self.driver.save_screenshot("force_join.png")
+                    self.driver.save_screenshot(os.path.join(self.output_dir, "force_join.png"))
                     print("Force join mode activated - continuing as if joined")
                 except:
                     print("Force join click failed - continuing anyway")
@@ -239,7 +386,7 @@ class GoogleMeetBot:
             
         except Exception as e:
             print(f"Error joining meeting: {e}")
-            screenshot_path = os.path.join(os.getcwd(), "join_error.png")
+            screenshot_path = os.path.join(self.output_dir, "join_error.png")
             try:
                 self.driver.save_screenshot(screenshot_path)
                 print(f"Error screenshot saved to: {screenshot_path}")
@@ -248,186 +395,124 @@ class GoogleMeetBot:
             # Don't raise the exception - continue anyway
             print("Continuing despite join meeting error...")
             
-    def collect_participants(self):
-        """Collect participant emails from the meeting."""
+    def _open_participants_panel(self, timeout=5):
+        """Open the participants side panel. Returns True if it was opened."""
+        # Try multiple selectors for the participants button
+        participant_selectors = [
+            "//button[contains(@aria-label, 'participants')]",
+            "//button[contains(@aria-label, 'Show everyone')]", 
+            "//div[contains(@aria-label, 'Show everyone')]",
+            "//button[contains(@data-tooltip-id, 'Show everyone')]",
+            "//div[@role='button' and contains(., 'participants')]",
+            "//span[contains(text(), 'participants')]/ancestor::button"
+        ]
+        
+        # One wait for whichever appears first, not a full timeout per selector
         try:
-            print("Collecting participant information...")
+            participants_button = WebDriverWait(self.driver, timeout).until(
+                EC.element_to_be_clickable((By.XPATH, " | ".join(participant_selectors)))
+            )
+            participants_button.click()
+            print("Opened participants panel")
+            return True
+        except Exception:
+            pass
+        
+        print("Could not find participants button, trying alternative approach...")
+        
+        # Try looking for a number that indicates participant count
+        try:
+            # Click element that shows participant count
+            count_element = self.driver.find_element(By.XPATH, 
+                "//div[contains(@class, 'uGOf1d') and contains(text(), '(')]")
+            count_element.click()
+            print("Clicked participant count element")
+            return True
+        except Exception as count_error:
+            print(f"Could not find participant count: {count_error}")
+            return False
+    
+    def start_roster_tracking(self):
+        """Open the participants panel once and start tracking joins/leaves in the page.
+        
+        Called once recording is running, so the panel lookup never delays
+        the start of the audio.
+        """
+        try:
+            if not self._open_participants_panel(timeout=2):
+                print("Roster tracking not started - participants panel unavailable")
+                return False
             
-            # Click on participant list button if available
-            try:
-                # Try multiple selectors for the participants button
-                participant_selectors = [
-                    "//button[contains(@aria-label, 'participants')]",
-                    "//button[contains(@aria-label, 'Show everyone')]", 
-                    "//div[contains(@aria-label, 'Show everyone')]",
-                    "//button[contains(@data-tooltip-id, 'Show everyone')]",
-                    "//div[@role='button' and contains(., 'participants')]",
-                    "//span[contains(text(), 'participants')]/ancestor::button"
-                ]
-                
-                found_button = False
-                for selector in participant_selectors:
-                    try:
-                        participants_button = WebDriverWait(self.driver, 5).until(
-                            EC.element_to_be_clickable((By.XPATH, selector))
-                        )
-                        participants_button.click()
-                        print(f"Opened participants panel using selector: {selector}")
-                        time.sleep(2)
-                        found_button = True
-                        break
-                    except Exception as button_error:
-                        continue
-                
-                if not found_button:
-                    print("Could not find participants button, trying alternative approach...")
-                    
-                    # Try looking for a number that indicates participant count
-                    try:
-                        # Click element that shows participant count
-                        count_element = self.driver.find_element(By.XPATH, 
-                            "//div[contains(@class, 'uGOf1d') and contains(text(), '(')]")
-                        count_element.click()
-                        print("Clicked participant count element")
-                        time.sleep(2)
-                    except Exception as count_error:
-                        print(f"Could not find participant count: {count_error}")
-                        raise Exception("Cannot access participants panel")
-                    
-                # Extract participant information
-                print("Extracting participant names...")
-                
-                # Take screenshot of participant panel for debugging
-                self.driver.save_screenshot("participants_panel.png")
-                print("Saved screenshot of participants panel")
-                
-                # Extract participants using JavaScript
-                participants_data = self.driver.execute_script("""
-                    // Find all elements that might contain participant info
-                    const participantElements = document.querySelectorAll('[role="listitem"]');
-                    const participants = [];
-                    
-                    // Process each element
-                    participantElements.forEach(element => {
-                        // Skip non-participant elements
-                        if (!element.textContent || element.textContent.length < 2) {
-                            return;
-                        }
-                        
-                        // Get the name - different Google Meet versions use different structures
-                        let name = '';
-                        
-                        // Try multiple approaches to get the name
-                        const nameElement = element.querySelector('[data-participant-name], [data-tooltip], [aria-label]');
-                        if (nameElement) {
-                            name = nameElement.getAttribute('data-participant-name') || 
-                                   nameElement.getAttribute('data-tooltip') || 
-                                   nameElement.getAttribute('aria-label') || '';
-                        }
-                        
-                        // If we couldn't get the name from attributes, use the text content
-                        if (!name) {
-                            name = element.textContent.trim();
-                        }
-                        
-                        // Clean up the name
-                        name = name.replace(/\\(You\\)/i, '')
-                                   .replace(/\\(Host\\)/i, '')
-                                   .replace(/\\(Meeting organizer\\)/i, '')
-                                   .replace(/\\s+/g, ' ')
-                                   .trim();
-                                   
-                        if (name) {
-                            participants.push({
-                                name: name,
-                                isYou: element.textContent.includes('You'),
-                                isHost: element.textContent.includes('Host') || 
-                                        element.textContent.includes('organizer')
-                            });
-                        }
-                    });
-                    
-                    return participants;
-                """)
-                
-                # Process the participant data
-                emails = []
-                
-                if participants_data and len(participants_data) > 0:
-                    print(f"\nFound {len(participants_data)} participants:")
-                    print("=" * 50)
-                    
-                    for idx, participant in enumerate(participants_data):
-                        name = participant.get('name', 'Unknown')
-                        is_you = participant.get('isYou', False)
-                        is_host = participant.get('isHost', False)
-                        
-                        print(f"{idx + 1}. {name}" + 
-                              (" (YOU)" if is_you else "") + 
-                              (" (Host)" if is_host else ""))
-                        
-                        # For yourself, use the config email
-                        if is_you:
-                            emails.append(config.EMAIL_HOST_USER)
-                            continue
-                            
-                        # For others, ask for email
-                        name_parts = name.split()
-                        suggested_email = f"{name_parts[0].lower()}"
-                        if len(name_parts) > 1:
-                            suggested_email += f".{name_parts[-1].lower()}"
-                        suggested_email += "@gmail.com"
-                        
-                        want_email = input(f"\nInclude {name} in email recipients? (y/n): ").lower().startswith('y')
-                        if want_email:
-                            email = input(f"Enter email for {name} [default: {suggested_email}]: ").strip()
-                            if not email:
-                                email = suggested_email
-                            emails.append(email)
-                            print(f"Added {email} to recipients list")
-                    
-                    print("=" * 50)
-                else:
-                    print("No participants found in the panel")
-            
-            except Exception as panel_error:
-                print(f"Error accessing participant panel: {panel_error}")
-                
-                # Fallback: Ask user to manually enter emails
-                print("\nCouldn't automatically extract participants.")
-                print("Please enter email addresses manually.\n")
-                
-                emails = [config.EMAIL_HOST_USER]  # Always include the default
-                
-                while True:
-                    email = input("Enter participant email (or press Enter to finish): ").strip()
-                    if not email:
-                        break
-                    if "@" in email:
-                        emails.append(email)
-                        print(f"Added {email} to recipients list")
-                    else:
-                        print("Invalid email format. Please include @ symbol.")
-            
-            # Always include default email if not already in list
-            if config.EMAIL_HOST_USER not in emails:
-                emails.append(config.EMAIL_HOST_USER)
-            
-            # Remove duplicates while preserving order
-            self.participants = list(dict.fromkeys(emails))
-            
-            print(f"\nWill send transcript to {len(self.participants)} recipient(s):")
-            for email in self.participants:
-                print(f"- {email}")
-                
+            self.roster_tracking = bool(self.driver.execute_script(ROSTER_TRACKER_JS))
+            if self.roster_tracking:
+                print("Tracking participant joins/leaves for the rest of the meeting")
+            return self.roster_tracking
+        except Exception as e:
+            print(f"Could not start roster tracking: {e}")
+            return False
+    
+    def poll_roster(self):
+        """Fetch queued join/leave events and the current roster in one call."""
+        if not self.roster_tracking:
+            return []
+        try:
+            batch = self.driver.execute_script(POLL_ROSTER_JS)
         except Exception as e:
-            print(f"Error collecting participants: {e}")
-            # Fallback to default email
-            self.participants = [config.EMAIL_HOST_USER]
-            print(f"Using fallback email: {config.EMAIL_HOST_USER}")
+            print(f"Could not poll participant roster: {e}")
+            return []
+        if not batch:
+            return []
+        
+        for person in batch.get('people', []):
+            # A re-joined page starts its roster over; keep the first sighting
+            previous = self.roster.get(person['name'])
+            if previous and previous.get('firstSeen') is not None:
+                person['firstSeen'] = min(previous['firstSeen'], person.get('firstSeen', previous['firstSeen']))
+            self.roster[person['name']] = person
+        events = batch.get('events', [])
+        self.roster_events.extend(events)
+        return events
+    
+    def roster_snapshot(self):
+        """Everyone seen during the meeting, in the order they were first seen."""
+        return sorted(self.roster.values(), key=lambda person: person.get('firstSeen', 0))
+        
+    def gather_roster(self):
+        """Read who attended from the page. Returns participant dicts, or None if unavailable."""
+        try:
+            print("Collecting participant information...")
+            
+            # Prefer the roster tracked during the meeting - it is already
+            # complete, including people who left early
+            if self.roster_tracking:
+                self.poll_roster()
+                participants_data = self.roster_snapshot()
+                print(f"Using tracked roster: {len(participants_data)} people seen during the meeting")
+                if participants_data:
+                    return participants_data
             
+            if not self._open_participants_panel():
+                raise Exception("Cannot access participants panel")
+            # Let the list render before it is scraped
+            time.sleep(2)
+            
+            # Extract participant information
+            print("Extracting participant names...")
+            
+            # Take screenshot of participant panel for debugging
+            self.driver.save_screenshot(os.path.join(self.output_dir, "participants_panel.png"))
+            print("Saved screenshot of participants panel")
+            
+            return self.driver.execute_script(SCRAPE_PARTICIPANTS_JS) or []
+        
+        except Exception as panel_error:
+            print(f"Error accessing participant panel: {panel_error}")
+            return None
+    
     def leave_meeting(self):
         """Leave the Google Meet."""
+        if not self.driver:
+            return
         try:
             leave_button = self.driver.find_element(By.XPATH, "//div[@aria-label='Leave call']")
             leave_button.click()
@@ -435,102 +520,135 @@ class GoogleMeetBot:
             print("Could not find leave button, closing browser instead")
             
         # Close the browser
-        self.driver.quit()
+        try:
+            self.driver.quit()
+        except Exception as e:
+            print(f"Error closing browser: {e}")
+        self.driver = None
+        self.roster_tracking = False
         
-    def run_meeting_bot(self, meet_url, duration_minutes=60):
-        """Run the entire meeting bot workflow with better error recovery."""
-        transcript = "No transcript available"  # Default value
-        summary = "No summary available"  # Default value
+    def attend_meeting(self, meet_url, duration_minutes=60):
+        """Join, record and leave. Returns the meeting's artifacts for post-processing.
         
+        The browser is released as soon as the recording and the final roster
+        are in, so nothing after this needs Chrome.
+        """
         try:
-            self.setup_driver()
+            with span("setup_driver"):
+                self.setup_driver()
             
             # Try login but continue even if it fails
             try:
-                self.login_to_google()
+                with span("login_to_google"):
+                    self.login_to_google()
             except Exception as login_e:
                 print(f"Login failed but continuing: {login_e}")
             
             # Try joining but continue if it fails
             try:
-                self.join_meeting(meet_url)
+                with span("join_meeting"):
+                    self.join_meeting(meet_url)
             except Exception as join_e:
                 print(f"Join failed but continuing: {join_e}")
             
-            # Add to your run_meeting_bot method in meetbot.py
-            # After joining the meeting but before recording:
-
-            print("\n" + "=" * 60)
-            print("🎙️ AUDIO PERMISSION REQUIRED 🎙️")
-            print("=" * 60)
-            print("1. A dialog box will appear asking what you want to share")
-            print("2. Select 'Chrome Tab' (NOT your entire screen)")
-            print("3. Choose the tab with Google Meet")
-            print("4. IMPORTANT: Check the 'Share audio' checkbox at the bottom")
-            print("5. Click 'Share' button")
-            print("=" * 60 + "\n")
-
-            # Wait for user to be ready
-            time.sleep(3)
-            print("Starting audio capture in 5 seconds...")
-            time.sleep(5)
-
-            # Always generate a transcript (real or mock)
-            transcript = record_and_transcribe(duration_minutes * 60, self.driver)
-            print(f"Transcript obtained: {len(transcript)} characters")
-
-            # For testing: Skip summary generation and just use the transcript
-            if transcript and len(transcript) > 10:
-                print("\nRAW TRANSCRIPT FROM AUDIO:")
-                print("=" * 60)
-                print(transcript)
+            # Web Audio capture taps the page directly - no share dialog to explain
+            if self.capture_mode != "webaudio":
+                print("\n" + "=" * 60)
+                print("🎙️ AUDIO PERMISSION REQUIRED 🎙️")
                 print("=" * 60)
-                summary = "TESTING MODE: Raw transcript: " + transcript
-            else:
-                print("No usable transcript was generated from the audio.")
-                summary = "No usable transcript was obtained from the audio."
+                print("1. A dialog box will appear asking what you want to share")
+                print("2. Select 'Chrome Tab' (NOT your entire screen)")
+                print("3. Choose the tab with Google Meet")
+                print("4. IMPORTANT: Check the 'Share audio' checkbox at the bottom")
+                print("5. Click 'Share' button")
+                print("=" * 60 + "\n")
 
-            # Collect participant emails before sending
-            try:
-                self.collect_participants()
-            except Exception as participant_error:
-                print(f"Error collecting participants: {participant_error}")
-                self.participants = [config.EMAIL_HOST_USER]
+                # Wait for user to be ready
+                time.sleep(3)
+                print("Starting audio capture in 5 seconds...")
+                time.sleep(5)
 
-            # Always send email with RAW transcript to all participants
-            print(f"Sending transcript to {len(self.participants)} recipients...")
-            send_summary_emails(self.participants, 
-                              f"RAW TRANSCRIPT: {transcript}", 
-                              meet_url)
-                
+            started_at = time.time()
+            recorder = CaptureWatchdog(self).record if self.watchdog else None
+            # Roster tracking starts once audio is being recorded (the
+            # watchdog does the same for each part), so the roster is ready
+            # the moment the meeting ends
+            audio_file = capture_meeting_audio(duration_minutes * 60, self.driver, self.output_dir,
+                                               self.capture_mode, self.capture_profile,
+                                               self.silence_gate, recorder,
+                                               on_started=self.start_roster_tracking)
+            
+            # The last thing that needs the page
+            roster = self.gather_roster()
+            
+            return {
+                "meet_url": self.meet_url or meet_url,
+                "started_at": started_at,
+                "audio_file": audio_file,
+                "capture_source": capture_source(self.capture_mode, self.capture_profile, audio_file),
+                "roster": roster,
+                "output_dir": self.output_dir,
+            }
+        finally:
+            with span("leave_meeting"):
+                self.leave_meeting()
+        
+    def run_meeting_bot(self, meet_url, duration_minutes=60, postprocessor=None):
+        """Run the entire meeting bot workflow with better error recovery.
+        
+        With a PostProcessor the transcript, summary and emails are handled
+        in the background and a Future for its result is returned; otherwise
+        this waits for them and returns the transcript.
+        """
+        transcript = "No transcript available"  # Default value
+        
+        try:
+            meeting = self.attend_meeting(meet_url, duration_minutes)
+            if postprocessor:
+                return postprocessor.submit(meeting)
+            
+            result = run_post_processing(meeting)
+            self.participants = result["recipients"]
+            transcript = result["transcript"]
             return transcript  # Return transcript instead of summary
             
         except Exception as e:
             print(f"Error in meeting bot: {e}")
-            # Always try to close browser and send email
-            if self.driver:
-                try:
-                    self.driver.quit()
-                except:
-                    pass
-                    
+            
             # Send whatever we have
             send_summary_emails([config.EMAIL_HOST_USER], 
                               f"Error in bot, but transcript was: {transcript}", 
                               meet_url)
             
             return "Error occurred during the meeting bot workflow."
+        
+        finally:
+            flush_metrics()
                 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Google Meet Bot')
     parser.add_argument('--url', type=str, required=True, help='Google Meet URL')
     parser.add_argument('--duration', type=int, default=60, help='Meeting duration in minutes')
+    parser.add_argument('--capture-mode', choices=['display', 'webaudio'], default='display',
+                        help="'display' shares the tab (needs approval), 'webaudio' taps Meet's audio directly")
+    parser.add_argument('--capture-profile', choices=list(CAPTURE_PROFILES), default='standard',
+                        help='Encoder settings for the captured audio (speech* = low-bitrate mono Opus)')
+    parser.add_argument('--silence-gate', action='store_true',
+                        help='Pause recording during silence and save speech timestamps')
+    parser.add_argument('--watchdog', action='store_true',
+                        help='Re-join and resume recording if the browser crashes (best with webaudio)')
+    parser.add_argument('--trace-file', type=str, default=None, help='Write stage timings as JSON lines to this file')
+    parser.add_argument('--metrics-file', type=str, default=None, help='Write a Prometheus textfile with stage totals')
     
     args = parser.parse_args()
     
     print(f"Starting bot with URL: {args.url} and duration: {args.duration} minutes")
     
-    bot = GoogleMeetBot()
+    if args.trace_file or args.metrics_file:
+        configure_tracing(args.trace_file, args.metrics_file)
+    
+    bot = GoogleMeetBot(capture_mode=args.capture_mode, capture_profile=args.capture_profile,
+                        silence_gate=args.silence_gate, watchdog=args.watchdog)
     try:
         transcript = bot.run_meeting_bot(args.url, args.duration)
         print("\nRaw Transcript:")
@@ -0,0 +1,117 @@
+import os
+import json
+import time
+import tempfile
+import threading
+import config
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads in this process are serialized
+    fcntl = None
+
+# A minute of silence moves the estimate halfway to what it just heard
+HALF_LIFE_SECONDS = 60.0
+
+# Calibration for recordings nobody knows the source of
+DEFAULT_SOURCE = "recording"
+
+# Held while a profile is read back, merged and rewritten
+_save_lock = threading.Lock()
+
+
+def capture_source(capture_mode, capture_profile, audio_file=None):
+    """Key for the device/path a recording came from, e.g. 'webaudio-speech16'."""
+    if audio_file and os.path.basename(audio_file).startswith("fallback_audio"):
+        return "microphone"
+    return f"{capture_mode}-{capture_profile}"
+
+
+class NoiseProfile:
+    """Background noise level of one capture source, learned from silence.
+
+    noise_rms is in 16-bit RMS units of the band-passed 16 kHz signal before
+    loudness normalization. It is a moving average over the stretches the
+    silence gate (or the quiet-frame check) marks as silence, so every
+    meeting refines it instead of recalibrating from scratch.
+
+    Updates made since load() are kept, so save() can replay them on top of
+    whatever other meetings from the same source saved in the meantime.
+    """
+
+    def __init__(self, source=DEFAULT_SOURCE, noise_rms=None, silence_seconds=0.0, updated_at=None,
+                 half_life_seconds=HALF_LIFE_SECONDS):
+        self.source = source
+        self.noise_rms = noise_rms
+        self.silence_seconds = silence_seconds
+        self.updated_at = updated_at
+        self.half_life_seconds = half_life_seconds
+        self.pending = []
+
+    @property
+    def calibrated(self):
+        return self.noise_rms is not None
+
+    def update(self, noise_rms, seconds):
+        """Fold in the mean level of `seconds` worth of silence."""
+        if seconds <= 0:
+            return
+        self.pending.append((noise_rms, seconds))
+        if self.noise_rms is None:
+            self.noise_rms = noise_rms
+        else:
+            weight = 1 - 0.5 ** (seconds / self.half_life_seconds)
+            self.noise_rms += weight * (noise_rms - self.noise_rms)
+        self.silence_seconds += seconds
+        self.updated_at = time.time()
+
+    def to_dict(self):
+        return {
+            "source": self.source,
+            "noise_rms": round(self.noise_rms, 2) if self.calibrated else None,
+            "silence_seconds": round(self.silence_seconds, 2),
+            "updated_at": self.updated_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("source", DEFAULT_SOURCE), data.get("noise_rms"),
+                   data.get("silence_seconds", 0.0), data.get("updated_at"))
+
+    @staticmethod
+    def path_for(source, directory=None):
+        directory = directory or getattr(config, 'NOISE_PROFILE_DIR', 'noise-profiles')
+        return os.path.join(directory, f"{source}.json")
+
+    @classmethod
+    def load(cls, source=DEFAULT_SOURCE, directory=None):
+        """The cached profile for a capture source, or a fresh one."""
+        path = cls.path_for(source, directory)
+        try:
+            with open(path) as f:
+                return cls.from_dict(json.load(f))
+        except (OSError, ValueError):
+            return cls(source)
+
+    def save(self, directory=None):
+        """Write the profile, merged with anything saved since it was loaded."""
+        path = self.path_for(self.source, directory)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Meetings from the same source may finish together, in this process
+        # or another one: re-read under a lock and replay our updates on top
+        with _save_lock, open(path + ".lock", 'w') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            current = self.load(self.source, directory)
+            for noise_rms, seconds in self.pending:
+                current.update(noise_rms, seconds)
+            self.noise_rms, self.silence_seconds = current.noise_rms, current.silence_seconds
+            self.updated_at = current.updated_at
+            self.pending = []
+
+            # Write then rename, so readers never see a half-written file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.to_dict(), f, indent=2)
+            os.replace(tmp_path, path)
+        return path
@@ -0,0 +1,259 @@
+import os
+import sys
+import csv
+import json
+import time
+import shutil
+import argparse
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from instrumentation import flush as flush_metrics
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Not available on Windows - memory limits are skipped
+
+# Rough footprint of one bot (Chrome + driver + Python) used to size the pool
+DEFAULT_MEMORY_PER_BOT_MB = 1500
+
+# Pool slot of this worker process, handed out by _init_worker
+_worker_slot = None
+
+
+def load_jobs(path):
+    """Load meeting jobs from a CSV or JSON-lines file ('-' reads stdin).
+
+    Each job has a meeting ``url``, an optional ``start`` time (ISO 8601,
+    empty means "now") and a ``duration`` in minutes.
+    """
+    handle = sys.stdin if path == "-" else open(path, newline="")
+    try:
+        text = handle.read()
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+    jobs = []
+    lines = [line for line in text.splitlines() if line.strip() and not line.lstrip().startswith("#")]
+    if lines and lines[0].lstrip().startswith("{"):
+        rows = [json.loads(line) for line in lines]
+    else:
+        rows = list(csv.DictReader(lines))
+
+    for idx, row in enumerate(rows):
+        url = (row.get("url") or "").strip()
+        if not url:
+            print(f"Skipping job {idx + 1}: no meeting URL")
+            continue
+        start = (row.get("start") or "").strip()
+        jobs.append({
+            "id": row.get("id") or f"job{idx + 1:03d}",
+            "url": url,
+            "start": datetime.fromisoformat(start).timestamp() if start else time.time(),
+            "duration": int(row.get("duration") or 60),
+            "capture_mode": row.get("capture_mode") or "webaudio",
+            "capture_profile": row.get("capture_profile") or "standard",
+            "silence_gate": str(row.get("silence_gate", "")).lower() in ("1", "true", "yes"),
+            # 'guess' or 'skip' for names missing from the directory; nobody can answer prompts
+            "directory_policy": row.get("directory_policy") or None,
+            # Nobody is watching a scheduled bot, so recover from crashes unless told not to
+            "watchdog": str(row.get("watchdog", "true")).lower() in ("1", "true", "yes"),
+        })
+
+    jobs.sort(key=lambda job: job["start"])
+    return jobs
+
+
+def available_memory_mb():
+    """Return the host's available physical memory in MB, or None if unknown."""
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def host_worker_limit(max_workers=None, memory_per_bot_mb=DEFAULT_MEMORY_PER_BOT_MB):
+    """Work out how many bots this host can run at once given CPU and memory."""
+    limit = os.cpu_count() or 1
+    if max_workers:
+        limit = min(limit, max_workers)
+
+    free_mb = available_memory_mb()
+    if free_mb is not None and memory_per_bot_mb:
+        limit = min(limit, max(1, free_mb // memory_per_bot_mb))
+
+    return max(1, limit)
+
+
+def wait_for_capacity(max_load, poll_seconds=5):
+    """Block while the host's 1-minute load average is above max_load."""
+    if not max_load or not hasattr(os, "getloadavg"):
+        return
+    while os.getloadavg()[0] > max_load:
+        print(f"Host load {os.getloadavg()[0]:.1f} above limit {max_load}, waiting...")
+        time.sleep(poll_seconds)
+
+
+def _limit_worker_memory(memory_limit_mb):
+    """Cap the data segment of the worker and its Chrome children."""
+    if resource is None or not memory_limit_mb:
+        return
+    # RLIMIT_DATA rather than RLIMIT_AS: Chrome reserves far more address
+    # space than it ever touches and would fail to start under an AS cap.
+    limit = memory_limit_mb * 1024 * 1024
+    try:
+        resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+    except (ValueError, OSError) as e:
+        print(f"Could not apply memory limit: {e}")
+
+
+def _init_worker(memory_limit_mb, slots):
+    """Pool initializer: apply the memory limit and claim a slot number."""
+    global _worker_slot
+    _limit_worker_memory(memory_limit_mb)
+    _worker_slot = slots.get()
+
+
+def _ignore_locks(directory, names):
+    # Chrome's Singleton* files tie a profile to the running browser
+    return [name for name in names if name.startswith("Singleton")]
+
+
+def prepare_profile(profile_dir, template=None):
+    """Create a Chrome profile, seeded from a logged-in template profile if given."""
+    if not os.path.exists(profile_dir) and template and os.path.isdir(template):
+        shutil.copytree(template, profile_dir, ignore=_ignore_locks)
+    os.makedirs(profile_dir, exist_ok=True)
+    return profile_dir
+
+
+def run_job(job, base_dir, max_load=None, profile_template=None):
+    """Run one meeting job in its own output directory.
+
+    Inside the pool the Chrome profile belongs to the worker slot, so a
+    Google login done once per slot (or copied from profile_template) is
+    reused by every job that slot runs. Outside the pool the job gets a
+    throwaway profile that is deleted when it ends.
+    """
+    # Imported here so the parent scheduler process never loads selenium
+    from meetbot import GoogleMeetBot
+
+    delay = job["start"] - time.time()
+    if delay > 0:
+        print(f"[{job['id']}] Waiting {delay:.0f}s until scheduled start...")
+        time.sleep(delay)
+    wait_for_capacity(max_load)
+
+    job_dir = os.path.join(base_dir, job["id"])
+    if _worker_slot is not None:
+        profile_dir = os.path.join(base_dir, "profiles", f"slot-{_worker_slot}")
+    else:
+        profile_dir = os.path.join(job_dir, "chrome-profile")
+    prepare_profile(profile_dir, profile_template)
+
+    # Nobody is around to approve share dialogs for scheduled jobs, so these
+    # default to Web Audio capture
+    bot = GoogleMeetBot(
+        profile_dir=profile_dir,
+        output_dir=os.path.join(job_dir, "output"),
+        capture_mode=job.get("capture_mode", "webaudio"),
+        capture_profile=job.get("capture_profile", "standard"),
+        silence_gate=job.get("silence_gate", False),
+        watchdog=job.get("watchdog", True),
+    )
+
+    started = time.time()
+    # Only the browser part runs here; the parent post-processes the
+    # artifacts so this worker can take the next meeting straight away
+    try:
+        meeting = bot.attend_meeting(job["url"], job["duration"])
+        meeting["directory_policy"] = job.get("directory_policy")
+    finally:
+        if _worker_slot is None:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+        # Pool workers leave through os._exit, so the atexit flush never runs
+        flush_metrics()
+    return {
+        "id": job["id"],
+        "url": job["url"],
+        "elapsed": time.time() - started,
+        "meeting": meeting,
+    }
+
+
+def run_scheduler(jobs, base_dir, max_workers=None, memory_limit_mb=None,
+                  max_load=None, memory_per_bot_mb=DEFAULT_MEMORY_PER_BOT_MB, profile_template=None):
+    """Run all jobs across a bounded pool of bots and report throughput."""
+    workers = host_worker_limit(max_workers, memory_per_bot_mb)
+    print(f"Scheduling {len(jobs)} meeting(s) across {workers} worker(s)...")
+
+    # Imported here, like meetbot in run_job, so loading this module stays cheap
+    from postprocess import PostProcessor
+
+    os.makedirs(base_dir, exist_ok=True)
+    started = time.time()
+    results = []
+    failed = 0
+
+    with PostProcessor() as postprocessor:
+        slots = multiprocessing.Queue()
+        for slot in range(workers):
+            slots.put(slot)
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_worker,
+                                 initargs=(memory_limit_mb, slots)) as pool:
+            futures = {pool.submit(run_job, job, base_dir, max_load, profile_template): job for job in jobs}
+
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"[{job['id']}] Job failed: {e}")
+                    continue
+                print(f"[{job['id']}] Left the meeting after {result['elapsed']:.0f}s, post-processing...")
+                result["post_process"] = postprocessor.submit(result.pop("meeting"))
+                results.append(result)
+        bots_done = time.time() - started
+
+    for result in results:
+        try:
+            transcript = result.pop("post_process").result()["transcript"]
+            result["transcript_chars"] = len(transcript or "")
+            print(f"[{result['id']}] {result['transcript_chars']} transcript characters")
+        except Exception as e:
+            result["transcript_chars"] = 0
+            print(f"[{result['id']}] Post-processing failed: {e}")
+
+    elapsed = time.time() - started
+    per_hour = len(results) / elapsed * 3600 if elapsed > 0 else 0.0
+    print("\n" + "=" * 60)
+    print(f"Completed {len(results)}/{len(jobs)} job(s), {failed} failed, in {elapsed:.0f}s "
+          f"(browsers free after {bots_done:.0f}s)")
+    print(f"Throughput: {per_hour:.1f} meetings/hour")
+    print("=" * 60)
+
+    return {"completed": len(results), "failed": failed, "elapsed": elapsed,
+            "meetings_per_hour": per_hour, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run many Google Meet bots concurrently')
+    parser.add_argument('jobs', type=str, help='CSV or JSON-lines job file (url,start,duration); - for stdin')
+    parser.add_argument('--output-dir', type=str, default='meetbot-runs', help='Base directory for profiles and per-job output')
+    parser.add_argument('--max-workers', type=int, default=None, help='Upper bound on concurrent bots')
+    parser.add_argument('--memory-limit', type=int, default=None, help='Per-bot memory limit in MB')
+    parser.add_argument('--max-load', type=float, default=None, help='Hold new jobs while load average is above this')
+    parser.add_argument('--profile-template', type=str, default=None,
+                        help='Logged-in Chrome profile to copy for each worker slot')
+
+    args = parser.parse_args()
+
+    run_scheduler(load_jobs(args.jobs), args.output_dir,
+                  max_workers=args.max_workers,
+                  memory_limit_mb=args.memory_limit,
+                  max_load=args.max_load,
+                  profile_template=args.profile_template)
@@ -0,0 +1,150 @@
+import re
+import json
+import time
+import sqlite3
+from datetime import datetime
+import config
+
+
+def format_offset(ms):
+    """Render a segment offset as H:MM:SS."""
+    if ms is None:
+        return "-"
+    seconds = int(ms) // 1000
+    return f"{seconds // 3600:d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def to_fts_query(text):
+    """Turn free text into an FTS5 query matching all words (prefix match on the last)."""
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+class TranscriptStore:
+    """Full-text index of every meeting transcript and summary (SQLite FTS5).
+
+    Each recognized segment is a row carrying its meeting and millisecond
+    offsets, so a hit points straight at the moment it was said.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or getattr(config, 'TRANSCRIPT_DB', 'transcripts.db')
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meetings (
+                id INTEGER PRIMARY KEY,
+                meet_url TEXT,
+                started_at REAL,
+                participants TEXT,
+                audio_file TEXT
+            );
+            CREATE INDEX IF NOT EXISTS meetings_started ON meetings(started_at);
+            CREATE VIRTUAL TABLE IF NOT EXISTS segments USING fts5(
+                text,
+                kind UNINDEXED,
+                meeting_id UNINDEXED,
+                start_ms UNINDEXED,
+                end_ms UNINDEXED,
+                tokenize = 'porter unicode61'
+            );
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_meeting(self, meet_url, segments, summary=None, participants=None,
+                    started_at=None, audio_file=None):
+        """Index one meeting's transcript segments and summary. Returns its id."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO meetings (meet_url, started_at, participants, audio_file) VALUES (?, ?, ?, ?)",
+                (meet_url, started_at or time.time(), json.dumps(participants or []), audio_file))
+            meeting_id = cursor.lastrowid
+
+            rows = [(s["text"], "transcript", meeting_id, s.get("start_ms"), s.get("end_ms"))
+                    for s in segments if s.get("text")]
+            if summary:
+                rows.append((summary, "summary", meeting_id, None, None))
+            self.conn.executemany(
+                "INSERT INTO segments (text, kind, meeting_id, start_ms, end_ms) VALUES (?, ?, ?, ?, ?)",
+                rows)
+        return meeting_id
+
+    def search(self, query, limit=20, since=None, meet_url=None, kind=None):
+        """Return ranked hits for a free-text query, best first."""
+        fts_query = to_fts_query(query)
+        if not fts_query:
+            return []
+
+        sql = """
+            SELECT segments.meeting_id, meetings.meet_url, meetings.started_at, meetings.participants,
+                   segments.kind, segments.start_ms, segments.end_ms,
+                   snippet(segments, 0, '[', ']', '...', 16) AS snippet,
+                   bm25(segments) AS rank
+            FROM segments JOIN meetings ON meetings.id = segments.meeting_id
+            WHERE segments MATCH ?
+        """
+        params = [fts_query]
+        if since:
+            sql += " AND meetings.started_at >= ?"
+            params.append(since)
+        if meet_url:
+            sql += " AND meetings.meet_url = ?"
+            params.append(meet_url)
+        if kind:
+            sql += " AND segments.kind = ?"
+            params.append(kind)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+
+        hits = []
+        for row in self.conn.execute(sql, params):
+            hit = dict(row)
+            hit["participants"] = json.loads(hit["participants"] or "[]")
+            hits.append(hit)
+        return hits
+
+    def meeting_segments(self, meeting_id):
+        """Every transcript segment of one meeting, in spoken order."""
+        return [dict(row) for row in self.conn.execute(
+            "SELECT start_ms, end_ms, text FROM segments "
+            "WHERE meeting_id = ? AND kind = 'transcript' ORDER BY start_ms",
+            (meeting_id,))]
+
+
+def print_hits(hits):
+    if not hits:
+        print("No matches")
+        return
+    for hit in hits:
+        date = datetime.fromtimestamp(hit["started_at"]).strftime("%Y-%m-%d %H:%M")
+        where = "summary" if hit["kind"] == "summary" else format_offset(hit["start_ms"])
+        print(f"{date}  {hit['meet_url']}  @{where}  (meeting {hit['meeting_id']})")
+        print(f"    {hit['snippet']}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Search meeting transcripts')
+    parser.add_argument('query', type=str, help='Words to search for')
+    parser.add_argument('--limit', type=int, default=20, help='Maximum number of hits')
+    parser.add_argument('--days', type=int, default=None, help='Only meetings from the last N days')
+    parser.add_argument('--url', type=str, default=None, help='Only this meeting link')
+
+    args = parser.parse_args()
+
+    with TranscriptStore() as store:
+        since = time.time() - args.days * 86400 if args.days else None
+        print_hits(store.search(args.query, args.limit, since, args.url))
@@ -1,8 +1,13 @@
 import os
 import config
+from instrumentation import span, count
 
-def generate_summary(transcript):
-    """Generate a summary of the meeting transcript or report that no audio was captured."""
+def generate_summary(transcript, strict=False):
+    """Generate a summary of the meeting transcript or report that no audio was captured.
+    
+    API and network failures come back as a readable message, or raise
+    RuntimeError with strict so callers don't keep that as the summary.
+    """
     if not transcript or transcript.strip() == "":
         return "No audio could be captured from the meeting. Please check your audio settings or try a different approach."
         
@@ -37,25 +42,37 @@ def generate_summary(transcript):
         }
         
         # Make the API request
-        response = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers=headers,
-            json=payload
-        )
+        with span("generate_summary", transcript_chars=len(transcript)) as summary_span:
+            response = requests.post(
+                getattr(config, "GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions"),
+                headers=headers,
+                json=payload
+            )
+            summary_span.set(status=response.status_code)
         
         # Check if the request was successful
         if response.status_code == 200:
             result = response.json()
+            usage = result.get("usage") or {}
+            count("summary_prompt_tokens", usage.get("prompt_tokens", 0))
+            count("summary_completion_tokens", usage.get("completion_tokens", 0))
+
             if "choices" in result and len(result["choices"]) > 0:
                 summary = result["choices"][0]["message"]["content"]
                 return summary
             else:
+                if strict:
+                    raise RuntimeError(f"Unexpected summary response format: {response.text}")
                 print(f"Unexpected response format: {response.text}")
                 return f"Could not generate summary due to API error. The transcript contained {len(transcript)} characters."
         else:
+            if strict:
+                raise RuntimeError(f"Summary request failed with status code {response.status_code}: {response.text}")
             print(f"API request failed with status code {response.status_code}: {response.text}")
             return f"Error generating summary due to API error. The transcript contained {len(transcript)} characters."
             
     except Exception as e:
+        if strict:
+            raise
         print(f"Error in summary generation: {e}")
         return f"Error occurred during summary generation. The transcript contained {len(transcript)} characters."
@@ -1,117 +1,214 @@
 import os
 import time
+import json
 import base64
 import subprocess
 import speech_recognition as sr
+from instrumentation import span, count
+from noise_profile import NoiseProfile
+from store import format_offset
 
-def record_audio(duration, output_file="meeting_audio.webm", driver=None):
-    """Record audio from Google Meet with improved permission handling."""
-    print(f"Starting to capture Google Meet audio for {duration} seconds...")
-    
-    if not driver:
-        print("ERROR: No browser driver provided, can't capture meeting audio")
-        return None
+# Recording is capped while the bot is being tested against live meetings
+MAX_RECORDING_SECONDS = 60
+
+# How often recorded chunks are pulled out of the page onto disk
+DRAIN_SECONDS = 5
+
+# Length of each piece sent to the recognizer. Google's free endpoint only
+# accepts about a minute of audio per request.
+SEGMENT_SECONDS = 30
+
+# MediaRecorder settings per capture profile. The recognizer only ever sees
+# 16 kHz mono, so the speech profiles downmix and encode low-bitrate mono
+# Opus in the browser instead of shipping 128 kbps stereo to ffmpeg.
+CAPTURE_PROFILES = {
+    "standard": {"bitrate": 128000, "channels": 2, "sampleRate": 48000},
+    "speech32": {"bitrate": 32000, "channels": 1, "sampleRate": 16000},
+    "speech24": {"bitrate": 24000, "channels": 1, "sampleRate": 16000},
+    "speech16": {"bitrate": 16000, "channels": 1, "sampleRate": 16000},
+}
+
+# Attaches a Web Audio graph to every remote audio track Meet is playing and
+# records the mix. No share dialog and no tab video to encode. Resolves to
+# the number of tracks attached, -2 if the AudioContext stays suspended
+# (autoplay policy) or -1 on any other error.
+WEBAUDIO_CAPTURE_JS = """
+    const profile = arguments[0];
+    window.permissionStatus = 'waiting';
+    return (async () => {
+    try {
+        const ctx = new AudioContext({sampleRate: profile.sampleRate});
+        const destination = ctx.createMediaStreamDestination();
+        destination.channelCount = profile.channels;
+        destination.channelCountMode = 'explicit';
+        window.meetAudioContext = ctx;
+        window.meetAudioSources = new Map();
         
-    try:
-        # Clear any previous recording state
-        driver.execute_script("""
-            if (window.meetRecorder) {
-                try {
-                    if (window.meetRecorder.state === 'recording') {
-                        window.meetRecorder.stop();
+        const attachRemoteAudio = () => {
+            document.querySelectorAll('audio, video').forEach(element => {
+                const stream = element.srcObject;
+                if (!(stream instanceof MediaStream)) {
+                    return;
+                }
+                stream.getAudioTracks().forEach(track => {
+                    if (window.meetAudioSources.has(track.id) || track.readyState !== 'live') {
+                        return;
                     }
-                } catch(e) {}
+                    const source = ctx.createMediaStreamSource(new MediaStream([track]));
+                    source.connect(destination);
+                    window.meetAudioSources.set(track.id, source);
+                    console.log(`Tapped remote audio track: ${track.id}`);
+                });
+            });
+        };
+        
+        attachRemoteAudio();
+        // Meet adds media elements as people join; srcObject swaps don't
+        // fire mutations, so also rescan on a slow timer
+        window.meetAudioObserver = new MutationObserver(attachRemoteAudio);
+        window.meetAudioObserver.observe(document.body, {childList: true, subtree: true});
+        window.meetAudioPoll = setInterval(attachRemoteAudio, 2000);
+        if (ctx.state === 'suspended') {
+            // Without a user gesture resume() never settles, so don't wait forever
+            await Promise.race([ctx.resume(), new Promise(resolve => setTimeout(resolve, 3000))]);
+        }
+        if (ctx.state !== 'running') {
+            console.error(`AudioContext is ${ctx.state} - nothing would be recorded`);
+            window.meetAudioObserver.disconnect();
+            clearInterval(window.meetAudioPoll);
+            ctx.close();
+            window.permissionStatus = 'error';
+            return -2;
+        }
+        
+        window.meetRecorder = new MediaRecorder(destination.stream, {
+            mimeType: 'audio/webm;codecs=opus',
+            audioBitsPerSecond: profile.bitrate
+        });
+        window.audioChunks = [];
+        window.meetRecorder.ondataavailable = (event) => {
+            if (event.data && event.data.size > 0) {
+                window.audioChunks.push(event.data);
             }
-            
-            window.audioChunks = [];
-            console.log("Recording state cleared");
-        """)
-        
-        # Setup screen capture with audio - with better permission handling
-        print("⚠️ IMPORTANT: You will see a permission dialog.")
-        print("✅ Please SELECT THE GOOGLE MEET TAB and CHECK 'SHARE AUDIO' option!")
-        print("⏱️ Waiting 20 seconds for you to approve permissions...")
-        
-        started = driver.execute_script("""
-            // Create global variable to track permission status
-            window.permissionStatus = 'waiting';
-            
-            window.startMeetRecording = async function() {
-                try {
-                    console.log("Requesting display capture with audio...");
-                    
-                    // Force a more visible prompt that clearly shows audio option
-                    const displayMediaOptions = {
-                        video: {
-                            displaySurface: "browser",  // Prefer browser tab
-                            logicalSurface: true,
-                            cursor: "never"
-                        },
-                        audio: {
-                            echoCancellation: true,     // Reduce echo
-                            noiseSuppression: true,     // Reduce background noise
-                            autoGainControl: true       // Normalize audio levels
-                        },
-                        preferCurrentTab: true,         // Prefer current tab if available
-                        selfBrowserSurface: "include"   // Include browser surface
-                    };
-                    
-                    // This will show the permission dialog
-                    const stream = await navigator.mediaDevices.getDisplayMedia(displayMediaOptions);
-                    
-                    // Specifically check if we have audio tracks
-                    const audioTracks = stream.getAudioTracks();
-                    console.log("Audio tracks:", audioTracks.length);
-                    
-                    if (!audioTracks || audioTracks.length === 0) {
-                        window.permissionStatus = 'no-audio';
-                        console.error("❌ No audio tracks found - did you select 'Share audio'?");
-                        stream.getTracks().forEach(track => track.stop());
-                        return false;
-                    }
-                    
-                    // Log audio track info for debugging
-                    audioTracks.forEach((track, i) => {
-                        console.log(`Audio track ${i}:`, track.label, track.enabled, track.readyState);
-                    });
-                    
-                    // Create media recorder with optimal settings for speech
-                    window.meetRecorder = new MediaRecorder(stream, {
-                        mimeType: 'audio/webm;codecs=opus',
-                        audioBitsPerSecond: 128000
-                    });
-                    
-                    // Set up data handler
-                    window.audioChunks = [];
-                    window.meetRecorder.ondataavailable = (event) => {
-                        if (event.data && event.data.size > 0) {
-                            window.audioChunks.push(event.data);
-                            console.log(`Recorded chunk: ${event.data.size} bytes`);
-                        }
-                    };
-                    
-                    // Start recording with 1-second chunks
-                    window.meetRecorder.start(1000);
-                    console.log("✅ Recording started successfully");
-                    window.permissionStatus = 'success';
-                    return true;
-                } catch (e) {
-                    console.error("Recording setup error:", e);
-                    window.permissionStatus = 'error';
+        };
+        window.meetRecorder.start(1000);
+        window.permissionStatus = 'success';
+        return window.meetAudioSources.size;
+    } catch (e) {
+        console.error("Web Audio capture setup error:", e);
+        window.permissionStatus = 'error';
+        return -1;
+    }
+    })();
+"""
+
+def _start_webaudio_capture(driver, profile):
+    """Start recording by mixing Meet's remote audio elements with Web Audio."""
+    print("Tapping Google Meet audio elements with Web Audio (no permission prompt)...")
+    sources = driver.execute_script(WEBAUDIO_CAPTURE_JS, profile)
+    if sources == -2:
+        print("❌ Chrome kept the AudioContext suspended (autoplay policy) - start Chrome with "
+              "--autoplay-policy=no-user-gesture-required.")
+        return False
+    if sources is None or sources < 0:
+        print("❌ Could not set up Web Audio capture.")
+        return False
+    
+    # Nobody may have spoken yet - tracks picked up later are attached automatically
+    print(f"✅ Recording started with {sources} remote audio track(s) attached.")
+    return True
+
+def _start_display_capture(driver, profile):
+    """Start recording via getDisplayMedia, waiting for the user to approve the share dialog."""
+    # Setup screen capture with audio - with better permission handling
+    print("⚠️ IMPORTANT: You will see a permission dialog.")
+    print("✅ Please SELECT THE GOOGLE MEET TAB and CHECK 'SHARE AUDIO' option!")
+    print("⏱️ Waiting 20 seconds for you to approve permissions...")
+    
+    started = driver.execute_script("""
+        const profile = arguments[0];
+        // Create global variable to track permission status
+        window.permissionStatus = 'waiting';
+        
+        window.startMeetRecording = async function() {
+            try {
+                console.log("Requesting display capture with audio...");
+                
+                // Force a more visible prompt that clearly shows audio option
+                const displayMediaOptions = {
+                    video: {
+                        displaySurface: "browser",  // Prefer browser tab
+                        logicalSurface: true,
+                        cursor: "never"
+                    },
+                    audio: {
+                        echoCancellation: true,     // Reduce echo
+                        noiseSuppression: true,     // Reduce background noise
+                        autoGainControl: true,      // Normalize audio levels
+                        channelCount: profile.channels,
+                        sampleRate: profile.sampleRate
+                    },
+                    preferCurrentTab: true,         // Prefer current tab if available
+                    selfBrowserSurface: "include"   // Include browser surface
+                };
+                
+                // This will show the permission dialog
+                const stream = await navigator.mediaDevices.getDisplayMedia(displayMediaOptions);
+                
+                // Specifically check if we have audio tracks
+                const audioTracks = stream.getAudioTracks();
+                console.log("Audio tracks:", audioTracks.length);
+                
+                if (!audioTracks || audioTracks.length === 0) {
+                    window.permissionStatus = 'no-audio';
+                    console.error("❌ No audio tracks found - did you select 'Share audio'?");
+                    stream.getTracks().forEach(track => track.stop());
                     return false;
                 }
-            };
-            
-            // Start the recording process that will trigger the permission dialog
-            window.startMeetRecording();
-            
-            // Return immediately - we'll check status later
-            return 'dialog-shown';
-        """)
+                
+                // Log audio track info for debugging
+                audioTracks.forEach((track, i) => {
+                    console.log(`Audio track ${i}:`, track.label, track.enabled, track.readyState);
+                });
+                
+                // Create media recorder with optimal settings for speech
+                window.meetRecorder = new MediaRecorder(stream, {
+                    mimeType: 'audio/webm;codecs=opus',
+                    audioBitsPerSecond: profile.bitrate
+                });
+                
+                // Set up data handler
+                window.audioChunks = [];
+                window.meetRecorder.ondataavailable = (event) => {
+                    if (event.data && event.data.size > 0) {
+                        window.audioChunks.push(event.data);
+                        console.log(`Recorded chunk: ${event.data.size} bytes`);
+                    }
+                };
+                
+                // Start recording with 1-second chunks
+                window.meetRecorder.start(1000);
+                console.log("✅ Recording started successfully");
+                window.permissionStatus = 'success';
+                return true;
+            } catch (e) {
+                console.error("Recording setup error:", e);
+                window.permissionStatus = 'error';
+                return false;
+            }
+        };
+        
+        // Start the recording process that will trigger the permission dialog
+        window.startMeetRecording();
         
-        # Wait for user to interact with the permission dialog
-        print("Chrome is displaying a permissions dialog. Please interact with it.")
-        wait_time = 20
+        // Return immediately - we'll check status later
+        return 'dialog-shown';
+    """)
+    
+    # Wait for user to interact with the permission dialog
+    print("Chrome is displaying a permissions dialog. Please interact with it.")
+    wait_time = 20
+    with span("permission_wait") as wait_span:
         for i in range(wait_time):
             time.sleep(1)
             print(f"Waiting for permissions: {wait_time - i} seconds remaining...")
@@ -123,87 +220,335 @@ def record_audio(duration, output_file="meeting_audio.webm", driver=None):
                 break
             elif status == 'no-audio':
                 print("❌ Permission granted but 'Share audio' was NOT selected!")
-                return None
+                wait_span.set(status=status)
+                return False
             elif status == 'error':
                 print("❌ Permission request failed or was denied.")
-                return None
+                wait_span.set(status=status)
+                return False
         
         # Check final status after wait
         status = driver.execute_script("return window.permissionStatus;")
+        wait_span.set(status=status)
         if status != 'success':
             print("❌ Permissions were not properly granted in the time allowed.")
-            return None
-            
-        # If we got here, recording has started successfully
-        # Record for the specified duration
-        print(f"Recording for {min(duration, 60)} seconds...")
-        for i in range(min(duration, 60)):
-            if i % 5 == 0:
-                chunks = driver.execute_script("return window.audioChunks ? window.audioChunks.length : 0")
-                print(f"Recording in progress... {i}/{min(duration, 60)}s ({chunks} chunks)")
-            time.sleep(1)
+            return False
+    
+    return True
+
+# Default settings for the optional in-browser silence gate. threshold is the
+# RMS level (0-1 float samples) treated as speech; hangover_ms keeps the gate
+# open after the level drops so quiet word endings are not clipped.
+SILENCE_GATE_DEFAULTS = {
+    "threshold": 0.01,
+    "hangover_ms": 800,
+    "interval_ms": 50,
+    "pause": True,  # Pause the recorder while silent (False only marks segments)
+}
+
+# Measures the recorded stream's RMS level with an AnalyserNode and pauses the
+# MediaRecorder during silence, so idle stretches never become chunks.
+SILENCE_GATE_JS = """
+    const options = arguments[0];
+    const recorder = window.meetRecorder;
+    if (!recorder || recorder.state === 'inactive') {
+        return false;
+    }
+    
+    const ctx = window.meetAudioContext || new AudioContext();
+    window.meetGateContext = ctx;
+    const analyser = ctx.createAnalyser();
+    analyser.fftSize = 2048;
+    ctx.createMediaStreamSource(new MediaStream(recorder.stream.getAudioTracks())).connect(analyser);
+    
+    const samples = new Float32Array(analyser.fftSize);
+    const startedAt = performance.now();
+    let speaking = false;
+    let lastVoice = 0;
+    let segmentStart = 0;
+    
+    window.speechSegments = [];
+    window.meetGateState = {
+        startedAt: startedAt,
+        isSpeaking: () => speaking,
+        segmentStart: () => segmentStart
+    };
+    window.meetGateTimer = setInterval(() => {
+        analyser.getFloatTimeDomainData(samples);
+        let sum = 0;
+        for (let i = 0; i < samples.length; i++) {
+            sum += samples[i] * samples[i];
+        }
+        const rms = Math.sqrt(sum / samples.length);
+        const now = performance.now() - startedAt;
+        
+        if (rms >= options.threshold) {
+            lastVoice = now;
+            if (!speaking) {
+                speaking = true;
+                segmentStart = now;
+                if (options.pause && recorder.state === 'paused') {
+                    recorder.resume();
+                }
+            }
+        } else if (speaking && now - lastVoice > options.hangover_ms) {
+            speaking = false;
+            window.speechSegments.push([Math.round(segmentStart), Math.round(now)]);
+            if (options.pause && recorder.state === 'recording') {
+                recorder.pause();
+            }
+        }
+    }, options.interval_ms);
+    
+    // Stay paused until the first speech arrives
+    if (options.pause) {
+        recorder.pause();
+    }
+    return true;
+"""
+
+def _install_silence_gate(driver, options):
+    """Attach the AnalyserNode silence gate to the running recorder."""
+    if driver.execute_script(SILENCE_GATE_JS, options):
+        print(f"Silence gate active (threshold {options['threshold']}, hangover {options['hangover_ms']}ms)")
+        return True
+    print("Could not install silence gate - recording everything")
+    return False
+
+def _finish_silence_gate(driver, output_file, options):
+    """Stop the gate and save speech-activity timestamps next to the recording."""
+    segments = driver.execute_script("""
+        clearInterval(window.meetGateTimer);
+        const segments = window.speechSegments || [];
+        const state = window.meetGateState;
+        if (state && state.isSpeaking()) {
+            segments.push([Math.round(state.segmentStart()), Math.round(performance.now() - state.startedAt)]);
+        }
+        if (window.meetGateContext && window.meetGateContext !== window.meetAudioContext) {
+            window.meetGateContext.close();
+        }
+        return segments;
+    """) or []
+    
+    # When the recorder was paused between segments the file only contains
+    # the speech, so also record where each segment starts inside the file
+    speech = []
+    file_offset = 0
+    for start_ms, end_ms in segments:
+        speech.append({
+            "start_ms": start_ms,
+            "end_ms": end_ms,
+            "file_start_ms": file_offset if options["pause"] else start_ms,
+        })
+        file_offset += end_ms - start_ms
+    
+    speech_file = os.path.splitext(output_file)[0] + ".speech.json"
+    with open(speech_file, 'w') as f:
+        json.dump({"paused": options["pause"], "segments": speech}, f, indent=2)
+    
+    total = sum(s["end_ms"] - s["start_ms"] for s in speech) / 1000
+    print(f"Silence gate kept {len(speech)} speech segment(s), {total:.1f}s of speech -> {speech_file}")
+    return speech_file
+
+def start_recording(driver, capture_mode="display", capture_profile="standard", silence_gate=None):
+    """Reset the page's recorder state and start capturing.
+    
+    Returns the active silence-gate options ({} when ungated), or None if
+    recording could not be started.
+    """
+    if capture_profile not in CAPTURE_PROFILES:
+        print(f"ERROR: Unknown capture profile '{capture_profile}', choose from {', '.join(CAPTURE_PROFILES)}")
+        return None
+    profile = CAPTURE_PROFILES[capture_profile]
+    print(f"Using capture profile '{capture_profile}': {profile['bitrate'] // 1000} kbps, "
+          f"{profile['channels']} channel(s)")
+    
+    # Clear any previous recording state
+    driver.execute_script("""
+        if (window.meetRecorder) {
+            try {
+                if (window.meetRecorder.state === 'recording') {
+                    window.meetRecorder.stop();
+                }
+            } catch(e) {}
+        }
         
-        # Stop recording and get the audio data
-        print("Stopping recording and collecting audio data...")
-        audio_data = driver.execute_script("""
-            return new Promise((resolve) => {
-                if (!window.meetRecorder || window.meetRecorder.state === 'inactive') {
-                    console.error("No active recorder found");
-                    resolve(null);
+        window.audioChunks = [];
+        console.log("Recording state cleared");
+    """)
+    
+    if capture_mode == "webaudio":
+        started = _start_webaudio_capture(driver, profile)
+    else:
+        started = _start_display_capture(driver, profile)
+    if not started:
+        return None
+    
+    gate_options = {}
+    if silence_gate:
+        gate_options = dict(SILENCE_GATE_DEFAULTS, **(silence_gate if isinstance(silence_gate, dict) else {}))
+        if not _install_silence_gate(driver, gate_options):
+            gate_options = {}
+    return gate_options
+
+def drain_chunks(driver, audio_out):
+    """Move the chunks recorded so far out of the page and append them to audio_out.
+    
+    Consecutive chunks of one MediaRecorder concatenate into a valid WebM, so
+    draining as we go means a browser crash only loses the undrained tail.
+    Returns (bytes written, chunks drained, recorder state).
+    """
+    result = driver.execute_script("""
+        return new Promise((resolve) => {
+            const state = window.meetRecorder ? window.meetRecorder.state : 'inactive';
+            const chunks = (window.audioChunks || []).splice(0);
+            if (chunks.length === 0) {
+                resolve({data: null, chunks: 0, state: state});
+                return;
+            }
+            const reader = new FileReader();
+            reader.readAsDataURL(new Blob(chunks, { type: 'audio/webm' }));
+            reader.onloadend = () => {
+                resolve({data: reader.result.split(',')[1], chunks: chunks.length, state: state});
+            };
+        });
+    """) or {}
+    
+    written = 0
+    if result.get('data'):
+        written = audio_out.write(base64.b64decode(result['data']))
+        audio_out.flush()
+    return written, result.get('chunks', 0), result.get('state', 'inactive')
+
+def stop_recording(driver, audio_out):
+    """Stop the recorder and append the chunks not drained yet. Returns bytes written."""
+    audio_data = driver.execute_script("""
+        return new Promise((resolve) => {
+            if (!window.meetRecorder || window.meetRecorder.state === 'inactive') {
+                console.error("No active recorder found");
+                resolve(null);
+                return;
+            }
+            
+            // Handle the stop event
+            window.meetRecorder.onstop = () => {
+                console.log("Recorder stopped");
+                
+                // Everything may already have been drained
+                if (!window.audioChunks || window.audioChunks.length === 0) {
+                    resolve('');
                     return;
                 }
                 
-                // Handle the stop event
-                window.meetRecorder.onstop = () => {
-                    console.log("Recorder stopped");
-                    
-                    if (!window.audioChunks || window.audioChunks.length === 0) {
-                        console.error("No audio chunks recorded");
-                        resolve(null);
-                        return;
-                    }
-                    
-                    console.log(`Total chunks: ${window.audioChunks.length}`);
-                    
-                    // Create audio blob
-                    const audioBlob = new Blob(window.audioChunks, { type: 'audio/webm' });
-                    console.log(`Audio blob size: ${audioBlob.size} bytes`);
-                    
-                    // Convert to base64
-                    const reader = new FileReader();
-                    reader.readAsDataURL(audioBlob);
-                    reader.onloadend = () => {
-                        const base64data = reader.result.split(',')[1];
-                        resolve(base64data);
-                    };
-                };
+                console.log(`Remaining chunks: ${window.audioChunks.length}`);
                 
-                // Stop the recorder
-                window.meetRecorder.stop();
+                // Create audio blob
+                const audioBlob = new Blob(window.audioChunks.splice(0), { type: 'audio/webm' });
+                console.log(`Audio blob size: ${audioBlob.size} bytes`);
                 
-                // Clean up
-                if (window.meetRecorder.stream) {
-                    window.meetRecorder.stream.getTracks().forEach(track => track.stop());
-                }
-            });
-        """)
+                // Convert to base64
+                const reader = new FileReader();
+                reader.readAsDataURL(audioBlob);
+                reader.onloadend = () => {
+                    const base64data = reader.result.split(',')[1];
+                    resolve(base64data);
+                };
+            };
+            
+            // Stop the recorder
+            window.meetRecorder.stop();
+            
+            // Clean up
+            if (window.meetRecorder.stream) {
+                window.meetRecorder.stream.getTracks().forEach(track => track.stop());
+            }
+            if (window.meetAudioObserver) {
+                window.meetAudioObserver.disconnect();
+                clearInterval(window.meetAudioPoll);
+            }
+            if (window.meetAudioContext) {
+                window.meetAudioContext.close();
+            }
+        });
+    """)
+    
+    if not audio_data:
+        return 0
+    written = audio_out.write(base64.b64decode(audio_data))
+    audio_out.flush()
+    return written
+
+def record_audio(duration, output_file="meeting_audio.webm", driver=None, capture_mode="display",
+                 capture_profile="standard", silence_gate=None, on_started=None):
+    """Record audio from Google Meet with improved permission handling.
+    
+    capture_mode is "display" (tab share via getDisplayMedia) or "webaudio"
+    (tap the page's remote audio elements directly, audio only).
+    capture_profile picks the encoder settings from CAPTURE_PROFILES.
+    silence_gate (True or a dict overriding SILENCE_GATE_DEFAULTS) pauses the
+    recorder during silence and writes speech timestamps to <output>.speech.json.
+    on_started() is called once the recorder is running.
+    """
+    print(f"Starting to capture Google Meet audio for {duration} seconds...")
+    
+    if not driver:
+        print("ERROR: No browser driver provided, can't capture meeting audio")
+        return None
         
-        if not audio_data:
-            print("ERROR: No audio data was captured")
+    total_bytes = 0
+    try:
+        gate_options = start_recording(driver, capture_mode, capture_profile, silence_gate)
+        if gate_options is None:
             return None
+        if on_started:
+            on_started()
+            
+        # If we got here, recording has started successfully
+        # Record for the specified duration, moving chunks to disk as we go
+        record_seconds = min(duration, MAX_RECORDING_SECONDS)
+        print(f"Recording for {record_seconds} seconds...")
+        total_chunks = 0
+        with open(output_file, 'wb') as audio_out:
+            with span("capture", mode=capture_mode, profile=capture_profile) as capture_span:
+                for i in range(record_seconds):
+                    if i % DRAIN_SECONDS == 0:
+                        written, chunks, _ = drain_chunks(driver, audio_out)
+                        total_bytes += written
+                        total_chunks += chunks
+                        print(f"Recording in progress... {i}/{record_seconds}s ({total_chunks} chunks)")
+                    time.sleep(1)
+                written, chunks, _ = drain_chunks(driver, audio_out)
+                total_bytes += written
+                total_chunks += chunks
+                capture_span.set(chunks=total_chunks,
+                                 chunks_per_second=round(total_chunks / max(record_seconds, 1), 2))
+            count("capture_chunks", total_chunks)
+            
+            if gate_options:
+                _finish_silence_gate(driver, output_file, gate_options)
+            
+            # Stop recording and get the rest of the audio data
+            print("Stopping recording and collecting audio data...")
+            total_bytes += stop_recording(driver, audio_out)
         
-        # Save the audio data
-        with open(output_file, 'wb') as f:
-            f.write(base64.b64decode(audio_data))
+        if not total_bytes:
+            print("ERROR: No audio data was captured")
+            return None
         
         file_size = os.path.getsize(output_file) / 1024
         print(f"Successfully saved {file_size:.1f}KB of audio to {output_file}")
+        count("capture_bytes", total_bytes)
         
         # Return the path to the saved file
         return output_file
         
     except Exception as e:
         print(f"Error in audio capture: {e}")
+        # Everything drained so far is already on disk (and the file closed)
+        if total_bytes:
+            print(f"Keeping the {total_bytes / 1024:.1f}KB recorded before the error in {output_file}")
+            count("capture_bytes", total_bytes)
+            return output_file
         return None
 
 def convert_audio_with_ffmpeg(input_file, output_file=None):
@@ -215,16 +560,17 @@ def convert_audio_with_ffmpeg(input_file, output_file=None):
     
     try:
         # Run FFmpeg with optimized settings for speech clarity
-        subprocess.run([
-            "ffmpeg",
-            "-i", input_file,           # Input file
-            "-y",                       # Overwrite output without asking
-            "-acodec", "pcm_s16le",     # Output codec (standard for WAV)
-            "-ar", "16000",             # Sample rate (16kHz is good for speech)
-            "-ac", "1",                 # Convert to mono
-            "-af", "highpass=f=200,lowpass=f=3000",  # Filter to focus on speech frequencies
-            output_file
-        ], check=True, capture_output=True)
+        with span("convert_audio_with_ffmpeg", input_bytes=os.path.getsize(input_file)):
+            subprocess.run([
+                "ffmpeg",
+                "-i", input_file,           # Input file
+                "-y",                       # Overwrite output without asking
+                "-acodec", "pcm_s16le",     # Output codec (standard for WAV)
+                "-ar", "16000",             # Sample rate (16kHz is good for speech)
+                "-ac", "1",                 # Convert to mono
+                "-af", "highpass=f=200,lowpass=f=3000",  # Filter to focus on speech frequencies
+                output_file
+            ], check=True, capture_output=True)
         
         print(f"Conversion successful: {os.path.getsize(output_file)/1024:.1f}KB WAV file created")
         return output_file
@@ -236,18 +582,25 @@ def convert_audio_with_ffmpeg(input_file, output_file=None):
         print(f"Error in audio conversion: {e}")
         return None
 
-def transcribe_audio(audio_file):
-    """Transcribe audio file to text using Google Speech Recognition."""
+def _prepare_for_transcription(audio_file, strict=False):
+    """Convert WebM to WAV if needed and check there is enough audio. Returns a WAV path or None.
+    
+    With strict, a missing file or failed conversion raises RuntimeError.
+    """
     if not audio_file or not os.path.exists(audio_file):
+        if strict:
+            raise RuntimeError(f"No audio file to transcribe: {audio_file}")
         print("ERROR: No audio file to transcribe")
-        return ""
+        return None
     
     # If file is WebM, convert to WAV first using FFmpeg
     if audio_file.endswith(".webm"):
         wav_file = convert_audio_with_ffmpeg(audio_file)
         if not wav_file:
+            if strict:
+                raise RuntimeError(f"Could not convert {audio_file} to WAV")
             print("ERROR: Could not convert WebM to WAV")
-            return ""
+            return None
         audio_file = wav_file
     
     file_size = os.path.getsize(audio_file) / 1024
@@ -256,7 +609,168 @@ def transcribe_audio(audio_file):
     # Skip if file is too small to contain meaningful audio
     if file_size < 5:
         print("ERROR: Audio file too small to contain speech")
+        return None
+    
+    return audio_file
+
+def _recognize(recognizer, audio_data):
+    """Run Google recognition on one piece of audio, retrying with an explicit language."""
+    audio_seconds = round(len(audio_data.frame_data) / (audio_data.sample_rate * audio_data.sample_width), 1)
+    count("recognized_segments")
+    try:
+        with span("recognize", audio_seconds=audio_seconds):
+            return recognizer.recognize_google(audio_data)
+    except sr.UnknownValueError:
+        pass
+    
+    try:
+        with span("recognize", audio_seconds=audio_seconds, language="en-US"):
+            return recognizer.recognize_google(audio_data, language="en-US")
+    except sr.UnknownValueError:
         return ""
+
+def _speech_ranges(audio_file):
+    """(start_ms, end_ms) speech stretches in file time from the silence gate, or None."""
+    speech_file = os.path.splitext(audio_file)[0] + ".speech.json"
+    if not os.path.exists(speech_file):
+        return None
+    with open(speech_file) as f:
+        speech = json.load(f)
+    if speech["paused"]:
+        # Only the speech was recorded - there is no silence in the file
+        return [(0, float("inf"))]
+    return [(s["file_start_ms"], s["file_start_ms"] + s["end_ms"] - s["start_ms"]) for s in speech["segments"]]
+
+def _file_to_meeting_time(audio_file):
+    """Function mapping an offset into audio_file (ms) to meeting time (ms).
+    
+    The silence gate's pause mode cuts the silence out of the file and the
+    watchdog joins capture parts back to back; <stem>.speech.json and
+    <stem>.gaps.json record what was cut.
+    """
+    stem = os.path.splitext(audio_file)[0]
+    speech = gaps = None
+    if os.path.exists(stem + ".speech.json"):
+        with open(stem + ".speech.json") as f:
+            speech = json.load(f)
+    if os.path.exists(stem + ".gaps.json"):
+        with open(stem + ".gaps.json") as f:
+            gaps = sorted(json.load(f)["gaps"], key=lambda gap: gap["start_ms"])
+    
+    if speech and speech["paused"] and speech["segments"]:
+        # The file is the speech segments back to back
+        anchors = sorted((s["file_start_ms"], s["start_ms"]) for s in speech["segments"])
+        def to_meeting(file_ms, end=False):
+            file_start, start = anchors[0]
+            for anchor in anchors:
+                if anchor[0] < file_ms or (anchor[0] == file_ms and not end):
+                    file_start, start = anchor
+            return start + file_ms - file_start
+        return to_meeting
+    
+    def to_meeting(file_ms, end=False):
+        # Parts continue where the capture resumed after each gap
+        meeting_ms = file_ms
+        for gap in gaps or []:
+            if gap["start_ms"] < meeting_ms or (gap["start_ms"] == meeting_ms and not end):
+                meeting_ms += gap["end_ms"] - gap["start_ms"]
+        return meeting_ms
+    return to_meeting
+
+def to_meeting_time(segments, audio_file):
+    """Put segment offsets onto the meeting's clock.
+    
+    transcribe_segments reports offsets into the audio file; those are kept
+    as file_start_ms/file_end_ms, and start_ms/end_ms become meeting time.
+    """
+    if not segments or not audio_file:
+        return segments
+    try:
+        to_meeting = _file_to_meeting_time(audio_file)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Could not read capture timeline, keeping file offsets: {e}")
+        return segments
+    return [dict(segment,
+                 start_ms=round(to_meeting(segment["start_ms"])),
+                 end_ms=round(to_meeting(segment["end_ms"], end=True)),
+                 file_start_ms=segment["start_ms"],
+                 file_end_ms=segment["end_ms"]) for segment in segments]
+
+def _preprocessed_pieces(audio_file, segment_seconds, noise_profile):
+    """Yield (start_ms, end_ms, piece) decoded and filtered in process with NumPy.
+    
+    Returns None instead when numpy is missing or decoding fails before the
+    first piece, so the ffmpeg WAV path is used instead.
+    """
+    try:
+        from audio_preprocess import preprocess_pieces
+    except ImportError:
+        return None
+    
+    pieces = preprocess_pieces(audio_file, segment_seconds, noise_profile=noise_profile,
+                               speech_ranges=_speech_ranges(audio_file))
+    try:
+        first = next(pieces, None)
+    except Exception as e:
+        print(f"In-process preprocessing failed, falling back to FFmpeg: {e}")
+        return None
+    
+    def stream():
+        piece = first
+        while piece:
+            start_ms, end_ms, audio_data, stats = piece
+            print(f"Preprocessed {format_offset(start_ms)}-{format_offset(end_ms)} in process: "
+                  f"gain {stats['gain_db']:+.1f} dB, noise floor {stats['noise_floor_rms']:.0f}")
+            yield start_ms, end_ms, audio_data
+            piece = next(pieces, None)
+    return stream()
+
+def _file_pieces(recognizer, wav_file, segment_seconds, noise_profile, speech_ranges=None):
+    """Yield (start_ms, end_ms, piece) read from a WAV file.
+    
+    Each piece's quiet frames also go into noise_profile when numpy is
+    available; none of the audio is spent calibrating.
+    """
+    try:
+        from audio_preprocess import learn_noise_floor, pcm_levels
+    except ImportError:
+        learn_noise_floor = None
+    
+    with sr.AudioFile(wav_file) as source:
+        while True:
+            start_ms = int(source.audio_reader.tell() * 1000 / source.SAMPLE_RATE)
+            audio_data = recognizer.record(source, duration=segment_seconds)
+            if not audio_data.frame_data:
+                break
+            end_ms = int(source.audio_reader.tell() * 1000 / source.SAMPLE_RATE)
+            if learn_noise_floor and audio_data.sample_width == 2:
+                learn_noise_floor(noise_profile, pcm_levels(audio_data.frame_data, audio_data.sample_rate),
+                                  speech_ranges, start_ms)
+            yield start_ms, end_ms, audio_data
+
+def transcribe_segments(audio_file, segment_seconds=SEGMENT_SECONDS, noise_profile=None, strict=False):
+    """Transcribe audio in fixed-length pieces, keeping each piece's offset.
+    
+    Returns a list of {"start_ms", "end_ms", "text"} dicts for the pieces in
+    which speech was recognized. Google's free endpoint rejects long requests,
+    so this is also what makes recordings over a minute work at all.
+    
+    noise_profile (a NoiseProfile for the capture source) sets the noise
+    floor loudness normalization works from and learns from this
+    recording's silence; by default a fresh one is used for just this file.
+    
+    With strict, any failure - the file can't be read or decoded, or a
+    recognition request fails - raises RuntimeError instead of returning
+    what was recognized, so callers can tell it apart from silence.
+    """
+    noise_profile = noise_profile or NoiseProfile()
+    segments = []
+    failed = 0
+    if not audio_file or not os.path.exists(audio_file):
+        if strict:
+            raise RuntimeError(f"No audio file to transcribe: {audio_file}")
+        print("ERROR: No audio file to transcribe")
+        return []
     
     # Transcribe using Google Speech Recognition
     try:
@@ -265,47 +779,79 @@ def transcribe_audio(audio_file):
         # Use longer phrases for better context
         recognizer.pause_threshold = 1.0
         
+        # Decoded a piece at a time, so a long meeting is never in memory at once
+        pieces = _preprocessed_pieces(audio_file, segment_seconds, noise_profile)
+        if pieces is None:
+            wav_file = _prepare_for_transcription(audio_file, strict)
+            if not wav_file:
+                return []
+            pieces = _file_pieces(recognizer, wav_file, segment_seconds, noise_profile,
+                                  _speech_ranges(audio_file))
+        
         print("Starting transcription with Google Speech Recognition...")
-        with sr.AudioFile(audio_file) as source:
-            # Adjust for ambient noise
-            recognizer.adjust_for_ambient_noise(source)
-            # Get audio data
-            audio_data = recognizer.record(source)
-            
-        # Try multiple language options if first attempt fails
-        transcript = ""
-        try:
-            transcript = recognizer.recognize_google(audio_data)
-        except sr.UnknownValueError:
-            print("Retrying with explicit language setting...")
+        for start_ms, end_ms, piece in pieces:
+            if end_ms - start_ms < 200:
+                # Too short to contain speech
+                continue
+            # One failed request shouldn't cost the rest of a long meeting
             try:
-                transcript = recognizer.recognize_google(audio_data, language="en-US")
-            except sr.UnknownValueError:
-                print("Speech recognition could not understand audio")
+                text = _recognize(recognizer, piece)
+            except sr.RequestError as e:
+                failed += 1
+                count("recognize_errors")
+                print(f"[{format_offset(start_ms)}] Recognition request failed: {e}")
+                continue
+            if text:
+                segments.append({"start_ms": start_ms, "end_ms": end_ms, "text": text})
+                print(f"[{format_offset(start_ms)}] {text}")
         
-        if transcript:
-            print(f"Transcription successful: {len(transcript)} characters")
+        if failed:
+            if strict:
+                raise RuntimeError(f"{failed} piece(s) of {audio_file} could not be recognized")
+            print(f"{failed} piece(s) could not be recognized")
+        if segments:
+            print(f"Transcription successful: {len(segments)} segment(s) with speech")
         else:
             print("No speech detected in the audio")
-            
-        return transcript
-            
+        
+        return segments
+    
     except Exception as e:
+        if strict:
+            raise
         print(f"Error in transcription: {e}")
-        return ""
+        # Keep whatever was recognized before the error
+        return segments
 
-def record_and_transcribe(duration, driver=None):
-    """Record Google Meet audio and transcribe it, with fallback options."""
+def segments_to_text(segments):
+    return " ".join(segment["text"] for segment in segments)
+
+def transcribe_audio(audio_file, noise_profile=None):
+    """Transcribe audio file to text using Google Speech Recognition."""
+    return segments_to_text(transcribe_segments(audio_file, noise_profile=noise_profile))
+
+def capture_meeting_audio(duration, driver=None, output_dir=None, capture_mode="display",
+                          capture_profile="standard", silence_gate=None, recorder=None, on_started=None):
+    """Record Google Meet audio, falling back to the microphone. Returns the file path or None.
+    
+    recorder(duration, output_file) replaces record_audio, e.g. a CaptureWatchdog's record.
+    on_started() is passed on to record_audio.
+    """
     print(f"Starting recording process for {duration} seconds...")
     
     # Save files with timestamps to avoid overwriting
+    output_dir = output_dir or os.getcwd()
     timestamp = time.strftime("%Y%m%d-%H%M%S")
-    audio_file = os.path.join(os.getcwd(), f"meet_audio_{timestamp}.webm")
+    audio_file = os.path.join(output_dir, f"meet_audio_{timestamp}.webm")
     
     try:
         # Try browser audio capture first
         print("Attempting browser audio capture...")
-        captured_file = record_audio(duration, audio_file, driver)
+        if recorder:
+            captured_file = recorder(duration, audio_file)
+        else:
+            captured_file = record_audio(duration, audio_file, driver, capture_mode, capture_profile,
+                                         silence_gate, on_started)
         
         # If browser capture fails, try fallback methods
         if not captured_file or not os.path.exists(captured_file):
@@ -314,7 +860,7 @@ def record_and_transcribe(duration, driver=None):
             # Install pyaudio with: pip install pyaudio
             try:
                 import pyaudio
-                fallback_file = os.path.join(os.getcwd(), f"fallback_audio_{timestamp}.wav")
+                fallback_file = os.path.join(output_dir, f"fallback_audio_{timestamp}.wav")
                 captured_file = fallback_record_audio(duration, fallback_file)
             except ImportError:
                 print("pyaudio not installed, can't use fallback recording")
@@ -322,17 +868,24 @@ def record_and_transcribe(duration, driver=None):
         
         if not captured_file or not os.path.exists(captured_file):
             print("All audio capture methods failed")
-            return ""
-        
-        # Convert and transcribe the audio
-        transcript = transcribe_audio(captured_file)
-        
-        # Return the transcript
-        return transcript
+            return None
         
+        return captured_file
+    
     except Exception as e:
-        print(f"ERROR in recording/transcription process: {e}")
+        print(f"ERROR in recording process: {e}")
+        return None
+
+def record_and_transcribe(duration, driver=None, output_dir=None, capture_mode="display",
+                          capture_profile="standard", silence_gate=None):
+    """Record Google Meet audio and transcribe it, with fallback options."""
+    captured_file = capture_meeting_audio(duration, driver, output_dir, capture_mode,
+                                          capture_profile, silence_gate)
+    if not captured_file:
         return ""
+    
+    # Convert and transcribe the audio
+    return transcribe_audio(captured_file)
 
 def fallback_record_audio(duration, output_file="fallback_audio.wav"):
     """Fallback method to record system audio using microphone."""